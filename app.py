@@ -15,10 +15,14 @@ import logging
 import signal
 import sys
 import os
+import time
 from typing import Optional
 from datetime import datetime
 from pathlib import Path
 
+# Reference point for cold-start timing (see scripts/import_report.py for a per-module breakdown)
+STARTED_AT = time.perf_counter()
+
 # Ensure directories exist
 Path("logs").mkdir(exist_ok=True)
 Path("data").mkdir(exist_ok=True)
@@ -41,15 +45,31 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Core imports
-from telegram.ext import Application
+from telegram.ext import Application, TypeHandler
+from telegram import Update
 from config.config import LastPerson07Config
 from db.client import LastPerson07DatabaseClient
+from db.quota import LastPerson07QuotaEngine
+from db.cached_client import LastPerson07CachedDatabaseClient
+from db.log_writer import LastPerson07LogWriter
+from db.counter_aggregator import LastPerson07CounterAggregator
 from utils.ui import LastPerson07UI
 from utils.reactions import LastPerson07Reactions
+from utils.fetcher import LastPerson07WallpaperFetcher
+from utils.prefetch import LastPerson07PrefetchPool
+from utils.file_id_cache import LastPerson07FileIdCache
+from utils.disk_cache import LastPerson07DiskCache
+from utils.http_client import LastPerson07HttpClient
+from utils.image_worker import LastPerson07ImageWorkerPool
+from utils.dedup import LastPerson07DuplicateIndex
+from utils.color_index import LastPerson07ColorIndex
+from utils.quality_scorer import LastPerson07QualityScorer
 from handlers.user_handlers import UserHandlers
 from handlers.admin_handlers import AdminHandlers
 from handlers.error_handler import ErrorHandler
 
+logger.info(f"📦 Modules imported in {(time.perf_counter() - STARTED_AT) * 1000:.0f}ms")
+
 class LastPerson07Bot:
     """🌟 Premium Wallpaper Fetching Bot with Beautiful UI"""
     
@@ -58,6 +78,18 @@ class LastPerson07Bot:
         self.config = LastPerson07Config()
         self.db_client: Optional[LastPerson07DatabaseClient] = None
         self.application: Optional[Application] = None
+        self.fetcher: Optional[LastPerson07WallpaperFetcher] = None
+        self.prefetch_pool: Optional[LastPerson07PrefetchPool] = None
+        self.file_id_cache: Optional[LastPerson07FileIdCache] = None
+        self.disk_cache: Optional[LastPerson07DiskCache] = None
+        self.http_client: Optional[LastPerson07HttpClient] = None
+        self.image_worker: Optional[LastPerson07ImageWorkerPool] = None
+        self.duplicate_index: Optional[LastPerson07DuplicateIndex] = None
+        self.color_index: Optional[LastPerson07ColorIndex] = None
+        self.quality_scorer: Optional[LastPerson07QualityScorer] = None
+        self.first_update_logged = False
+        self.log_writer: Optional[LastPerson07LogWriter] = None
+        self.counters: Optional[LastPerson07CounterAggregator] = None
         self.running = False
         
         # Initialize utility classes
@@ -90,10 +122,136 @@ class LastPerson07Bot:
             
             logger.info("✅ Database connection successful")
             
+            # Serve user profile reads from memory; writes through this client invalidate them
+            self.db_client = LastPerson07CachedDatabaseClient(
+                self.db_client,
+                self.config.USER_CACHE_SIZE,
+                self.config.USER_CACHE_TTL_SECONDS
+            )
+            self.admin_handlers.user_cache = self.db_client
+            
+            # Batch event log inserts instead of awaiting one per user action
+            self.log_writer = LastPerson07LogWriter(
+                self.db_client.db_client,
+                self.config.LOG_BATCH_SIZE,
+                self.config.LOG_FLUSH_SECONDS,
+                self.config.LOG_QUEUE_MAX,
+                self.config.LOG_OVERFLOW_POLICY
+            )
+            await self.log_writer.start()
+            self.db_client.log_writer = self.log_writer
+            self.admin_handlers.log_writer = self.log_writer
+            
             # Initialize handlers with database
             self.user_handlers.db_client = self.db_client
             self.admin_handlers.db_client = self.db_client
             
+            # Enforce the free fetch allowance atomically in per-day usage documents
+            self.user_handlers.quota_engine = LastPerson07QuotaEngine(
+                self.db_client,
+                self.config.FREE_FETCH_LIMIT,
+                self.config.QUOTA_RETENTION_DAYS
+            )
+            await self.user_handlers.quota_engine.ensure_indexes()
+            self.admin_handlers.quota_engine = self.user_handlers.quota_engine
+            
+            # Merge lifetime and per-category fetch counters in memory and write them in bulk
+            self.counters = LastPerson07CounterAggregator(
+                self.db_client,
+                self.config.COUNTER_FLUSH_SECONDS,
+                self.config.COUNTER_MAX_PENDING
+            )
+            await self.counters.start()
+            self.user_handlers.counters = self.counters
+            self.admin_handlers.counters = self.counters
+            
+            # Initialize Telegram file_id cache
+            self.file_id_cache = LastPerson07FileIdCache(self.db_client, self.config.FILE_ID_CACHE_SIZE)
+            self.user_handlers.file_id_cache = self.file_id_cache
+            self.admin_handlers.file_id_cache = self.file_id_cache
+            
+            # Load on-disk image cache
+            self.disk_cache = LastPerson07DiskCache(
+                self.config.IMAGE_CACHE_DIR,
+                self.config.IMAGE_CACHE_MAX_MB * 1024 * 1024
+            )
+            await self.disk_cache.load()
+            self.admin_handlers.disk_cache = self.disk_cache
+            
+            # Load near-duplicate index
+            self.duplicate_index = LastPerson07DuplicateIndex(
+                self.config.DEDUP_INDEX_PATH,
+                self.config.DEDUP_MAX_DISTANCE,
+                self.config.DEDUP_MAX_ENTRIES
+            )
+            await self.duplicate_index.load()
+            self.user_handlers.duplicate_index = self.duplicate_index
+            self.admin_handlers.duplicate_index = self.duplicate_index
+            
+            # Load colour filter index
+            self.color_index = LastPerson07ColorIndex(
+                self.config.COLOR_INDEX_PATH,
+                self.config.COLOR_INDEX_MAX_ENTRIES
+            )
+            await self.color_index.load()
+            self.user_handlers.color_index = self.color_index
+            self.admin_handlers.color_index = self.color_index
+            
+            # Start image worker processes for decoding and analysis
+            if self.config.IMAGE_WORKERS > 0:
+                self.image_worker = LastPerson07ImageWorkerPool(
+                    self.config.IMAGE_WORKERS,
+                    self.config.IMAGE_WORKER_MAX_PENDING,
+                    self.config.IMAGE_WORKER_TIMEOUT_SECONDS
+                )
+                self.image_worker.start()
+                self.user_handlers.image_processor.worker_pool = self.image_worker
+                self.admin_handlers.image_worker = self.image_worker
+            
+            # Open the shared HTTP connection pool
+            self.http_client = LastPerson07HttpClient(self.config)
+            await self.http_client.start()
+            self.admin_handlers.http_client = self.http_client
+            
+            # Initialize shared wallpaper fetcher
+            self.fetcher = LastPerson07WallpaperFetcher(
+                self.db_client,
+                self.config,
+                self.disk_cache,
+                self.http_client
+            )
+            await self.fetcher.initialize()
+            
+            # Pre-resolve and pre-connect to the wallpaper providers
+            await self.http_client.warm_up(self.fetcher.get_warmup_urls())
+            self.user_handlers.fetcher = self.fetcher
+            self.admin_handlers.fetcher = self.fetcher
+            
+            # Score cached wallpapers in the background so blurry ones are skipped
+            self.quality_scorer = LastPerson07QualityScorer(
+                self.disk_cache,
+                self.user_handlers.image_processor,
+                self.config
+            )
+            await self.quality_scorer.start()
+            self.fetcher.quality_scorer = self.quality_scorer
+            self.admin_handlers.quality_scorer = self.quality_scorer
+            
+            # Start background prefetch pool
+            if self.config.PREFETCH_ENABLED:
+                logger.info("🖼️ Starting wallpaper prefetch pool...")
+                self.prefetch_pool = LastPerson07PrefetchPool(
+                    self.fetcher,
+                    self.user_handlers.image_processor,
+                    self.config,
+                    self.duplicate_index,
+                    self.color_index,
+                    self.quality_scorer
+                )
+                await self.prefetch_pool.start()
+                self.user_handlers.prefetch_pool = self.prefetch_pool
+                self.admin_handlers.prefetch_pool = self.prefetch_pool
+            
             # Create Telegram application
             logger.info("🤖 Creating Telegram application...")
             self.application = Application.builder().token(self.config.TELEGRAM_TOKEN).build()
@@ -125,8 +283,19 @@ class LastPerson07Bot:
         # Register admin command handlers
         self.admin_handlers.register_handlers(self.application)
         
+        # Log cold-start latency once, ahead of every other handler group
+        self.application.add_handler(TypeHandler(Update, self._log_first_update), group=-1)
+        
         logger.info("✅ All handlers registered successfully")
     
+    async def _log_first_update(self, update: Update, context) -> None:
+        """Log the time from process start to the first update"""
+        if self.first_update_logged:
+            return
+        
+        self.first_update_logged = True
+        logger.info(f"⚡ First update {update.update_id} received {time.perf_counter() - STARTED_AT:.2f}s after start")
+    
     async def _setup_commands(self) -> None:
         """⚙️ Set up bot commands in Telegram"""
         logger.info("⚙️ Setting up bot commands...")
@@ -166,6 +335,38 @@ class LastPerson07Bot:
         logger.info("🔄 Starting graceful shutdown...")
         
         try:
+            # Stop prefetching and close HTTP sessions
+            if self.prefetch_pool:
+                await self.prefetch_pool.stop()
+            
+            if self.quality_scorer:
+                await self.quality_scorer.stop()
+            
+            if self.image_worker:
+                await self.image_worker.stop()
+            
+            if self.fetcher:
+                await self.fetcher.close()
+            
+            if self.http_client:
+                await self.http_client.close()
+            
+            if self.disk_cache:
+                await self.disk_cache.close()
+            
+            if self.duplicate_index:
+                await self.duplicate_index.close()
+            
+            if self.color_index:
+                await self.color_index.close()
+            
+            # Write pending counters and buffered event logs before the connection goes away
+            if self.counters:
+                await self.counters.stop()
+            
+            if self.log_writer:
+                await self.log_writer.stop()
+            
             # Close database connection
             if self.db_client:
                 await self.db_client.close()
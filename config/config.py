@@ -39,6 +39,87 @@ class LastPerson07Config:
         self.MAINTENANCE = os.getenv('MAINTENANCE', 'false').lower() == 'true'
         self.DELAY_MINUTES = int(os.getenv('DELAY_MINUTES', '5'))
         self.FREE_FETCH_LIMIT = int(os.getenv('FREE_FETCH_LIMIT', '5'))
+        self.QUOTA_RETENTION_DAYS = int(os.getenv('QUOTA_RETENTION_DAYS', '7'))
+        
+        # Provider Batch Settings (wallpapers requested per API call)
+        self.PROVIDER_BATCH_SIZE = int(os.getenv('PROVIDER_BATCH_SIZE', '30'))
+        
+        # Wallpaper Delivery Size (requested from providers so downloads pass validation unchanged)
+        self.WALLPAPER_TARGET_WIDTH = int(os.getenv('WALLPAPER_TARGET_WIDTH', '1920'))
+        self.WALLPAPER_TARGET_HEIGHT = int(os.getenv('WALLPAPER_TARGET_HEIGHT', '1080'))
+        self.WALLPAPER_JPEG_QUALITY = int(os.getenv('WALLPAPER_JPEG_QUALITY', '85'))
+        
+        # Prefetch Pool Settings
+        self.PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() == 'true'
+        self.PREFETCH_LOW_WATERMARK = int(os.getenv('PREFETCH_LOW_WATERMARK', '2'))
+        self.PREFETCH_HIGH_WATERMARK = int(os.getenv('PREFETCH_HIGH_WATERMARK', '5'))
+        self.PREFETCH_MEMORY_BUDGET_MB = int(os.getenv('PREFETCH_MEMORY_BUDGET_MB', '128'))
+        self.PREFETCH_CONCURRENCY = int(os.getenv('PREFETCH_CONCURRENCY', '2'))
+        
+        # Hedged Fetch Settings
+        self.HEDGED_FETCH_ENABLED = os.getenv('HEDGED_FETCH_ENABLED', 'true').lower() == 'true'
+        self.HEDGE_DELAY_SECONDS = float(os.getenv('HEDGE_DELAY_SECONDS', '1.5'))
+        
+        # Provider Circuit Breaker Settings
+        self.CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+        self.CIRCUIT_RECOVERY_SECONDS = float(os.getenv('CIRCUIT_RECOVERY_SECONDS', '60'))
+        
+        # Provider Rate Limit Settings (requests kept in reserve before a provider is skipped)
+        self.RATE_LIMIT_RESERVE = int(os.getenv('RATE_LIMIT_RESERVE', '2'))
+        
+        # Event Log Writer Settings (overflow policy: drop_oldest or drop_newest)
+        self.LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '100'))
+        self.LOG_FLUSH_SECONDS = float(os.getenv('LOG_FLUSH_SECONDS', '2'))
+        self.LOG_QUEUE_MAX = int(os.getenv('LOG_QUEUE_MAX', '5000'))
+        self.LOG_OVERFLOW_POLICY = os.getenv('LOG_OVERFLOW_POLICY', 'drop_oldest')
+        
+        # Fetch Counter Settings (per-user and per-category totals written in batches)
+        self.COUNTER_FLUSH_SECONDS = float(os.getenv('COUNTER_FLUSH_SECONDS', '5'))
+        self.COUNTER_MAX_PENDING = int(os.getenv('COUNTER_MAX_PENDING', '1000'))
+        
+        # User Profile Cache Settings
+        self.USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+        self.USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+        
+        # Telegram file_id Cache Settings
+        self.FILE_ID_CACHE_SIZE = int(os.getenv('FILE_ID_CACHE_SIZE', '5000'))
+        
+        # Image Download Settings
+        self.MAX_DOWNLOAD_MB = int(os.getenv('MAX_DOWNLOAD_MB', '20'))
+        self.DOWNLOAD_RETRIES = int(os.getenv('DOWNLOAD_RETRIES', '2'))
+        self.DOWNLOAD_RETRY_BACKOFF_SECONDS = float(os.getenv('DOWNLOAD_RETRY_BACKOFF_SECONDS', '0.5'))
+        self.DOWNLOAD_DEADLINE_SECONDS = float(os.getenv('DOWNLOAD_DEADLINE_SECONDS', '15'))
+        self.PLACEHOLDER_DIR = os.getenv('PLACEHOLDER_DIR', 'data/placeholders')
+        
+        # Shared HTTP Client Settings
+        self.HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', '100'))
+        self.HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '10'))
+        self.HTTP_DNS_CACHE_SECONDS = int(os.getenv('HTTP_DNS_CACHE_SECONDS', '300'))
+        self.HTTP_KEEPALIVE_SECONDS = float(os.getenv('HTTP_KEEPALIVE_SECONDS', '30'))
+        self.HTTP_TIMEOUT_SECONDS = float(os.getenv('HTTP_TIMEOUT_SECONDS', '30'))
+        
+        # On-disk Image Cache Settings
+        self.IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', 'data/images')
+        self.IMAGE_CACHE_MAX_MB = int(os.getenv('IMAGE_CACHE_MAX_MB', '512'))
+        
+        # Near-duplicate Suppression Settings (dHash Hamming distance)
+        self.DEDUP_INDEX_PATH = os.getenv('DEDUP_INDEX_PATH', 'data/dhash_index.json')
+        self.DEDUP_MAX_DISTANCE = int(os.getenv('DEDUP_MAX_DISTANCE', '6'))
+        self.DEDUP_MAX_ENTRIES = int(os.getenv('DEDUP_MAX_ENTRIES', '50000'))
+        
+        # Colour Filter Index Settings
+        self.COLOR_INDEX_PATH = os.getenv('COLOR_INDEX_PATH', 'data/color_index.json')
+        self.COLOR_INDEX_MAX_ENTRIES = int(os.getenv('COLOR_INDEX_MAX_ENTRIES', '5000'))
+        
+        # Quality Scoring Settings (0-1 score from sharpness, exposure and noise)
+        self.QUALITY_MIN_SCORE = float(os.getenv('QUALITY_MIN_SCORE', '0.45'))
+        self.QUALITY_SCAN_INTERVAL_SECONDS = float(os.getenv('QUALITY_SCAN_INTERVAL_SECONDS', '300'))
+        self.QUALITY_SCAN_BATCH = int(os.getenv('QUALITY_SCAN_BATCH', '20'))
+        
+        # Image Worker Pool Settings (0 workers runs image jobs in a thread instead)
+        self.IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '1'))
+        self.IMAGE_WORKER_MAX_PENDING = int(os.getenv('IMAGE_WORKER_MAX_PENDING', '8'))
+        self.IMAGE_WORKER_TIMEOUT_SECONDS = float(os.getenv('IMAGE_WORKER_TIMEOUT_SECONDS', '15'))
         
         # Wallpaper Categories
         self.WALLPAPER_CATEGORIES = [
@@ -109,6 +190,56 @@ class LastPerson07Config:
             errors.append("DELAY_MINUTES must be positive")
         if self.FREE_FETCH_LIMIT <= 0:
             errors.append("FREE_FETCH_LIMIT must be positive")
+        if self.QUOTA_RETENTION_DAYS <= 0:
+            errors.append("QUOTA_RETENTION_DAYS must be positive")
+        if self.PROVIDER_BATCH_SIZE <= 0:
+            errors.append("PROVIDER_BATCH_SIZE must be positive")
+        if self.WALLPAPER_TARGET_WIDTH <= 0 or self.WALLPAPER_TARGET_HEIGHT <= 0:
+            errors.append("WALLPAPER_TARGET_WIDTH and WALLPAPER_TARGET_HEIGHT must be positive")
+        if not 1 <= self.WALLPAPER_JPEG_QUALITY <= 100:
+            errors.append("WALLPAPER_JPEG_QUALITY must be between 1 and 100")
+        if self.PREFETCH_LOW_WATERMARK < 0 or self.PREFETCH_HIGH_WATERMARK < self.PREFETCH_LOW_WATERMARK:
+            errors.append("PREFETCH_HIGH_WATERMARK must be >= PREFETCH_LOW_WATERMARK >= 0")
+        if self.PREFETCH_MEMORY_BUDGET_MB <= 0 or self.PREFETCH_CONCURRENCY <= 0:
+            errors.append("PREFETCH_MEMORY_BUDGET_MB and PREFETCH_CONCURRENCY must be positive")
+        if self.RATE_LIMIT_RESERVE < 0:
+            errors.append("RATE_LIMIT_RESERVE cannot be negative")
+        if self.MAX_DOWNLOAD_MB <= 0:
+            errors.append("MAX_DOWNLOAD_MB must be positive")
+        if self.DOWNLOAD_RETRIES < 0 or self.DOWNLOAD_RETRY_BACKOFF_SECONDS < 0:
+            errors.append("DOWNLOAD_RETRIES and DOWNLOAD_RETRY_BACKOFF_SECONDS cannot be negative")
+        if self.DOWNLOAD_DEADLINE_SECONDS <= 0:
+            errors.append("DOWNLOAD_DEADLINE_SECONDS must be positive")
+        if self.HTTP_POOL_LIMIT <= 0 or self.HTTP_POOL_LIMIT_PER_HOST <= 0:
+            errors.append("HTTP_POOL_LIMIT and HTTP_POOL_LIMIT_PER_HOST must be positive")
+        if self.HTTP_DNS_CACHE_SECONDS < 0 or self.HTTP_KEEPALIVE_SECONDS < 0 or self.HTTP_TIMEOUT_SECONDS <= 0:
+            errors.append("HTTP_DNS_CACHE_SECONDS and HTTP_KEEPALIVE_SECONDS cannot be negative, HTTP_TIMEOUT_SECONDS must be positive")
+        if self.IMAGE_CACHE_MAX_MB <= 0:
+            errors.append("IMAGE_CACHE_MAX_MB must be positive")
+        if not 0 <= self.DEDUP_MAX_DISTANCE < 32 or self.DEDUP_MAX_ENTRIES <= 0:
+            errors.append("DEDUP_MAX_DISTANCE must be between 0 and 31 and DEDUP_MAX_ENTRIES positive")
+        if self.COLOR_INDEX_MAX_ENTRIES <= 0:
+            errors.append("COLOR_INDEX_MAX_ENTRIES must be positive")
+        if not 0 <= self.QUALITY_MIN_SCORE <= 1:
+            errors.append("QUALITY_MIN_SCORE must be between 0 and 1")
+        if self.QUALITY_SCAN_INTERVAL_SECONDS <= 0 or self.QUALITY_SCAN_BATCH <= 0:
+            errors.append("QUALITY_SCAN_INTERVAL_SECONDS and QUALITY_SCAN_BATCH must be positive")
+        if self.USER_CACHE_SIZE <= 0 or self.USER_CACHE_TTL_SECONDS <= 0:
+            errors.append("USER_CACHE_SIZE and USER_CACHE_TTL_SECONDS must be positive")
+        if self.LOG_BATCH_SIZE <= 0 or self.LOG_FLUSH_SECONDS <= 0 or self.LOG_QUEUE_MAX < self.LOG_BATCH_SIZE:
+            errors.append("LOG_BATCH_SIZE and LOG_FLUSH_SECONDS must be positive and LOG_QUEUE_MAX >= LOG_BATCH_SIZE")
+        if self.LOG_OVERFLOW_POLICY not in ('drop_oldest', 'drop_newest'):
+            errors.append("LOG_OVERFLOW_POLICY must be drop_oldest or drop_newest")
+        if self.COUNTER_FLUSH_SECONDS <= 0 or self.COUNTER_MAX_PENDING <= 0:
+            errors.append("COUNTER_FLUSH_SECONDS and COUNTER_MAX_PENDING must be positive")
+        if self.IMAGE_WORKERS < 0:
+            errors.append("IMAGE_WORKERS cannot be negative")
+        if self.IMAGE_WORKER_MAX_PENDING <= 0 or self.IMAGE_WORKER_TIMEOUT_SECONDS <= 0:
+            errors.append("IMAGE_WORKER_MAX_PENDING and IMAGE_WORKER_TIMEOUT_SECONDS must be positive")
+        if self.HEDGE_DELAY_SECONDS < 0:
+            errors.append("HEDGE_DELAY_SECONDS cannot be negative")
+        if self.CIRCUIT_FAILURE_THRESHOLD <= 0 or self.CIRCUIT_RECOVERY_SECONDS <= 0:
+            errors.append("CIRCUIT_FAILURE_THRESHOLD and CIRCUIT_RECOVERY_SECONDS must be positive")
         
         # Validate categories
         if not self.WALLPAPER_CATEGORIES:
@@ -0,0 +1,155 @@
+"""
+LastPerson07Bot Cached Database Client Module
+Bounded LRU+TTL cache of user profiles in front of the database client
+"""
+
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07CachedDatabaseClient:
+    """Database client facade serving get_user from memory; every other call passes through"""
+    
+    def __init__(self, db_client, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        """Initialize the cached client"""
+        self.db_client = db_client
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        # User ID -> (expiry time, user document or None), least recently used first
+        self._users: "OrderedDict[int, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        
+        # Buffered event log sink (attached by the bot); log_event goes straight to the database without one
+        self.log_writer = None
+        
+        # Bumped on every invalidation so a read that raced a write does not cache the old document
+        self._version = 0
+        
+        # Cache statistics
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'invalidations': 0,
+            'evictions': 0
+        }
+    
+    def __getattr__(self, name: str) -> Any:
+        """Pass anything not cached here straight to the wrapped client"""
+        return getattr(self.db_client, name)
+    
+    async def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a user, from memory while the cached copy is fresh"""
+        entry = self._users.get(user_id)
+        
+        if entry:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._users.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return copy.deepcopy(user)
+            
+            self.stats['expired'] += 1
+        
+        self.stats['misses'] += 1
+        version = self._version
+        user = await self.db_client.get_user(user_id)
+        
+        # Unknown users are cached too, until create_user invalidates them; the cache keeps its own copy
+        if version == self._version:
+            self._store(user_id, user)
+        return user
+    
+    async def create_user(self, user_id: int, *args, **kwargs) -> Any:
+        """Create a user and drop any cached lookup"""
+        try:
+            return await self.db_client.create_user(user_id, *args, **kwargs)
+        finally:
+            self.invalidate_user(user_id)
+    
+    async def update_user(self, user_id: int, updates: Dict[str, Any], *args, **kwargs) -> Any:
+        """Update a user and apply plain field changes to the cached copy"""
+        try:
+            result = await self.db_client.update_user(user_id, updates, *args, **kwargs)
+        except Exception:
+            self.invalidate_user(user_id)
+            raise
+        
+        self._version += 1
+        entry = self._users.get(user_id)
+        # Dotted paths and operators change nested or computed state, so those refetch instead of merging
+        if entry and entry[1] and not any('.' in key or key.startswith('$') for key in updates):
+            entry[1].update(copy.deepcopy(updates))
+        else:
+            self.invalidate_user(user_id)
+        
+        return result
+    
+    async def update_user_fetch_count(self, user_id: int, *args, **kwargs) -> Any:
+        """Bump a user's fetch count and drop the cached copy"""
+        try:
+            return await self.db_client.update_user_fetch_count(user_id, *args, **kwargs)
+        finally:
+            self.invalidate_user(user_id)
+    
+    async def set_user_tier(self, user_id: int, *args, **kwargs) -> Any:
+        """Change a user's tier and drop the cached copy"""
+        try:
+            return await self.db_client.set_user_tier(user_id, *args, **kwargs)
+        finally:
+            self.invalidate_user(user_id)
+    
+    async def ban_user(self, user_id: int, *args, **kwargs) -> Any:
+        """Ban a user and drop the cached copy"""
+        try:
+            return await self.db_client.ban_user(user_id, *args, **kwargs)
+        finally:
+            self.invalidate_user(user_id)
+    
+    async def unban_user(self, user_id: int, *args, **kwargs) -> Any:
+        """Unban a user and drop the cached copy"""
+        try:
+            return await self.db_client.unban_user(user_id, *args, **kwargs)
+        finally:
+            self.invalidate_user(user_id)
+    
+    async def log_event(self, *args, **kwargs) -> Any:
+        """Queue an event log entry on the log writer instead of inserting it inline"""
+        if self.log_writer:
+            return self.log_writer.log_event(*args, **kwargs)
+        return await self.db_client.log_event(*args, **kwargs)
+    
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget a cached user after a write made outside this client"""
+        self._version += 1
+        if self._users.pop(user_id, None) is not None:
+            self.stats['invalidations'] += 1
+    
+    def clear(self) -> None:
+        """Forget every cached user"""
+        self._users.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit statistics"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        
+        return {
+            'size': len(self._users),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0,
+            **self.stats
+        }
+    
+    def _store(self, user_id: int, user: Optional[Dict[str, Any]]) -> None:
+        """Cache a user document, evicting the least recently used beyond max_entries"""
+        self._users[user_id] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(user))
+        self._users.move_to_end(user_id)
+        
+        while len(self._users) > self.max_entries:
+            self._users.popitem(last=False)
+            self.stats['evictions'] += 1
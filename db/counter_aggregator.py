@@ -0,0 +1,188 @@
+"""
+LastPerson07Bot Counter Aggregator Module
+Write-behind counters merged in memory and flushed with one unordered bulk_write per collection
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07CounterAggregator:
+    """Merges $inc deltas per user and per category and writes them periodically"""
+    
+    CATEGORY_COLLECTION = 'category_stats'
+    
+    # User counters whose documents also record when they last moved, stamped at increment time with $max
+    USER_TIMESTAMPS = {'fetch_count': 'last_fetch_date'}
+    
+    def __init__(self, db_client, flush_interval: float = 5.0, max_pending: int = 1000):
+        """Initialize the counter aggregator"""
+        self.db_client = db_client
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        
+        # (collection, document ID) -> {'$inc': field -> delta, '$max': timestamp field -> latest increment}
+        self.pending: Dict[Tuple[str, Any], Dict[str, Dict[str, Any]]] = {}
+        
+        # Updates handed to bulk_write but not yet acknowledged; still counted by user_value
+        self._inflight: Dict[Tuple[str, Any], Dict[str, Dict[str, Any]]] = {}
+        
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        
+        # Aggregator statistics
+        self.stats = {
+            'increments': 0,
+            'flushes': 0,
+            'operations': 0,
+            'failed_flushes': 0
+        }
+    
+    async def start(self) -> None:
+        """Start the background flush loop"""
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Counter aggregator started (flushing every {self.flush_interval:.0f}s)")
+    
+    async def stop(self) -> None:
+        """Stop the flush loop and write the pending deltas"""
+        self.running = False
+        self._wakeup.set()
+        
+        if self._task and not self._task.done():
+            await asyncio.gather(self._task, return_exceptions=True)
+        
+        await self.flush()
+        if self.pending:
+            logger.warning(f"⚠️ Counter aggregator stopped with {len(self.pending)} unwritten counters")
+        logger.info("✅ Counter aggregator stopped")
+    
+    def increment_user(self, user_id: int, field: str = 'fetch_count', amount: int = 1) -> None:
+        """Add to a counter on a user document"""
+        self._increment(self.db_client.COLLECTIONS['users'], user_id, field, amount)
+    
+    def increment_category(self, category: str, field: str = 'fetches', amount: int = 1) -> None:
+        """Add to a counter on a category's stats document"""
+        self._increment(self.CATEGORY_COLLECTION, category, field, amount)
+    
+    def pending_delta(self, user_id: int, field: str = 'fetch_count') -> int:
+        """Get the not yet written delta of a user counter, including a write in flight"""
+        key = (self.db_client.COLLECTIONS['users'], user_id)
+        return sum(updates.get(key, {}).get('$inc', {}).get(field, 0) for updates in (self.pending, self._inflight))
+    
+    def user_value(self, user_data: Optional[Dict[str, Any]], user_id: int, field: str = 'fetch_count') -> int:
+        """Get the exact value of a user counter: the persisted count plus the pending delta"""
+        persisted = user_data.get(field, 0) if user_data else 0
+        return persisted + self.pending_delta(user_id, field)
+    
+    async def flush(self) -> bool:
+        """Write every pending delta; False if a bulk write failed"""
+        async with self._flush_lock:
+            if not self.pending:
+                return True
+            
+            # Readers keep seeing the deltas through _inflight until the write is acknowledged
+            self._inflight, self.pending = self.pending, {}
+            now = datetime.utcnow()
+            
+            # Group operations by collection so each gets a single bulk_write
+            operations: Dict[str, list] = {}
+            for (collection, document_id), updates in self._inflight.items():
+                # Users must already exist; category stats are created on first use
+                upsert = collection == self.CATEGORY_COLLECTION
+                operations.setdefault(collection, []).append(UpdateOne(
+                    {'_id': document_id},
+                    {**updates, '$set': {'counters_updated_at': now}},
+                    upsert=upsert
+                ))
+            
+            # Cached user documents are stale once their counters are written
+            invalidate_user = getattr(self.db_client, 'invalidate_user', None)
+            
+            success = True
+            for collection, ops in operations.items():
+                keys = [key for key in self._inflight if key[0] == collection]
+                try:
+                    await self.db_client.database[collection].bulk_write(ops, ordered=False)
+                    self.stats['operations'] += len(ops)
+                    
+                    if invalidate_user and collection == self.db_client.COLLECTIONS['users']:
+                        for _, document_id in keys:
+                            invalidate_user(document_id)
+                except Exception as e:
+                    success = False
+                    self.stats['failed_flushes'] += 1
+                    logger.error(f"❌ Error flushing {len(ops)} counters to {collection}: {e}")
+                    
+                    # Merge the updates back so they are retried on the next flush
+                    for key in keys:
+                        self._merge(self.pending, key, self._inflight[key])
+                
+                for key in keys:
+                    del self._inflight[key]
+            
+            self.stats['flushes'] += 1
+            return success
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pending counter and write statistics"""
+        increments = self.stats['increments']
+        operations = self.stats['operations'] + len(self.pending)
+        
+        # Share of increments that never needed a write of their own
+        return {
+            'running': self.running,
+            'pending': len(self.pending),
+            'in_flight': len(self._inflight),
+            'merge_ratio': 1 - operations / increments if increments else 0.0,
+            **self.stats
+        }
+    
+    def _increment(self, collection: str, document_id: Any, field: str, amount: int) -> None:
+        """Merge a delta into the pending counters, waking the flush loop when too many are pending"""
+        self.stats['increments'] += 1
+        updates = {'$inc': {field: amount}}
+        
+        if collection == self.db_client.COLLECTIONS['users'] and field in self.USER_TIMESTAMPS:
+            updates['$max'] = {self.USER_TIMESTAMPS[field]: datetime.utcnow()}
+        
+        self._merge(self.pending, (collection, document_id), updates)
+        
+        if len(self.pending) >= self.max_pending:
+            self._wakeup.set()
+    
+    @staticmethod
+    def _merge(
+        target: Dict[Tuple[str, Any], Dict[str, Dict[str, Any]]],
+        key: Tuple[str, Any],
+        updates: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """Fold updates into a pending document: $inc deltas add up, $max keeps the latest value"""
+        pending = target.setdefault(key, {})
+        
+        deltas = pending.setdefault('$inc', {})
+        for field, amount in updates.get('$inc', {}).items():
+            deltas[field] = deltas.get(field, 0) + amount
+        
+        for field, value in updates.get('$max', {}).items():
+            latest = pending.setdefault('$max', {})
+            if field not in latest or value > latest[field]:
+                latest[field] = value
+    
+    async def _run(self) -> None:
+        """Flush when the interval passes or too many counters are pending"""
+        while self.running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            
+            await self.flush()
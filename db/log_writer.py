@@ -0,0 +1,146 @@
+"""
+LastPerson07Bot Log Writer Module
+Buffered event log sink flushed to the logs collection with insert_many
+"""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any, Deque
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07LogWriter:
+    """Collects event log entries in a bounded queue and writes them in batches"""
+    
+    OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+    
+    def __init__(
+        self,
+        db_client,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        max_queue: int = 5000,
+        overflow_policy: str = 'drop_oldest'
+    ):
+        """Initialize the log writer"""
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log overflow policy: {overflow_policy}")
+        
+        self.db_client = db_client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        
+        self.queue: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        
+        # Writer statistics
+        self.stats = {
+            'queued': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped': 0,
+            'failed_batches': 0
+        }
+    
+    async def start(self) -> None:
+        """Start the background flush loop"""
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Log writer started (batches of {self.batch_size}, every {self.flush_interval:.1f}s)")
+    
+    async def stop(self) -> None:
+        """Stop the flush loop and write everything still queued"""
+        self.running = False
+        self._wakeup.set()
+        
+        if self._task and not self._task.done():
+            await asyncio.gather(self._task, return_exceptions=True)
+        
+        # Drain in batches; give up on a batch that fails rather than retrying forever at shutdown
+        while self.queue:
+            if not await self.flush():
+                break
+        
+        if self.queue:
+            logger.warning(f"⚠️ Log writer stopped with {len(self.queue)} unwritten events")
+        logger.info("✅ Log writer stopped")
+    
+    def log_event(self, level: str, message: str, user_id: Optional[int] = None, **extra) -> bool:
+        """Queue an event log entry without waiting for the database; False if it was dropped"""
+        entry = {
+            'level': level,
+            'message': message,
+            'user_id': user_id,
+            'timestamp': datetime.utcnow(),
+            **extra
+        }
+        
+        if len(self.queue) >= self.max_queue:
+            self.stats['dropped'] += 1
+            if self.overflow_policy == 'drop_newest':
+                return False
+            self.queue.popleft()
+        
+        self.queue.append(entry)
+        self.stats['queued'] += 1
+        
+        if len(self.queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+    
+    async def flush(self) -> bool:
+        """Write one batch of queued entries; False if the insert failed"""
+        async with self._flush_lock:
+            if not self.queue:
+                return True
+            
+            batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+            
+            try:
+                await self._collection().insert_many(batch, ordered=False)
+            except Exception as e:
+                self.stats['failed_batches'] += 1
+                logger.error(f"❌ Error writing {len(batch)} log events: {e}")
+                
+                # Put the batch back in front, keeping only what still fits in the queue
+                room = max(0, self.max_queue - len(self.queue))
+                self.stats['dropped'] += len(batch) - min(room, len(batch))
+                self.queue.extendleft(reversed(batch[:room]))
+                return False
+            
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+            return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and write statistics"""
+        return {
+            'running': self.running,
+            'pending': len(self.queue),
+            'max_queue': self.max_queue,
+            **self.stats
+        }
+    
+    async def _run(self) -> None:
+        """Flush when a batch fills up or the interval passes"""
+        while self.running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            
+            # Write full batches back to back; a failed insert waits for the next interval
+            while self.queue and await self.flush() and len(self.queue) >= self.batch_size:
+                pass
+    
+    def _collection(self):
+        """Get the logs collection"""
+        return self.db_client.database[self.db_client.COLLECTIONS.get('logs', 'logs')]
@@ -33,6 +33,7 @@ class User(BaseModel):
 
 class WallpaperInfo(BaseModel):
     """Wallpaper information model"""
+    photo_id: Optional[str] = Field(None, description="Provider photo ID")
     url: str = Field(..., description="Image URL")
     source: str = Field(..., description="Source name")
     width: int = Field(..., description="Image width")
@@ -5,16 +5,19 @@ Specialized database query operations
 
 import logging
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+
+from db.quota import LastPerson07QuotaEngine
 
 logger = logging.getLogger(__name__)
 
 class LastPerson07Queries:
     """Database query operations for LastPerson07Bot"""
     
-    def __init__(self, db_client):
-        """Initialize with database client"""
+    def __init__(self, db_client, daily_limit: int = 5, counters=None):
+        """Initialize with database client and an optional counter aggregator"""
         self.db_client = db_client
+        self.quota = LastPerson07QuotaEngine(db_client, daily_limit)
+        self.counters = counters
     
     async def get_or_create_user(self, user_id: int, username: str, first_name: str) -> Dict[str, Any]:
         """Get user from database or create if not exists"""
@@ -31,46 +34,19 @@ class LastPerson07Queries:
             return {}
     
     async def can_user_fetch_today(self, user_id: int) -> tuple[bool, int]:
-        """Check if user can fetch wallpapers today"""
-        try:
-            user = await self.db_client.get_user(user_id)
-            
-            if not user:
-                return True, 5  # Default limit
-            
-            if user.get('banned', False):
-                return False, 0
-            
-            if user.get('tier') == 'premium':
-                return True, float('inf')  # Unlimited for premium
-            
-            # Check daily limit for free users
-            today_fetches = await self._get_today_fetches(user_id)
-            remaining = 5 - today_fetches  # Default limit
-            
-            return remaining > 0, max(0, remaining)
-            
-        except Exception as e:
-            logger.error(f"❌ Error in can_user_fetch_today: {e}")
-            return False, 0
+        """Check if user can fetch wallpapers today without using up a fetch"""
+        return await self.quota.check(user_id)
+    
+    async def try_consume_fetch(self, user_id: int) -> tuple[bool, int]:
+        """Take one fetch from today's allowance when the user has one left"""
+        # Limit check and increment happen in one atomic update of today's usage document
+        allowed, remaining, _ = await self.quota.acquire(user_id)
+        return allowed, remaining
     
     async def _get_today_fetches(self, user_id: int) -> int:
         """Get today's fetch count for user"""
         try:
-            user = await self.db_client.get_user(user_id)
-            
-            if not user:
-                return 0
-            
-            today = datetime.utcnow().date()
-            last_fetch = user.get('last_fetch_date')
-            
-            if last_fetch and last_fetch.date() == today:
-                return user.get('fetch_count', 0)
-            else:
-                # Reset count if it's a new day
-                await self.db_client.update_user(user_id, {'fetch_count': 0})
-                return 0
+            return await self.quota.today_count(user_id)
                 
         except Exception as e:
             logger.error(f"❌ Error in _get_today_fetches: {e}")
@@ -79,7 +55,14 @@ class LastPerson07Queries:
     async def record_wallpaper_fetch(self, user_id: int, wallpaper_info: Dict[str, Any]) -> None:
         """Record a wallpaper fetch event"""
         try:
-            await self.db_client.update_user_fetch_count(user_id)
+            # Today's count was already taken by try_consume_fetch; this bumps the lifetime fetch_count
+            if self.counters:
+                self.counters.increment_user(user_id)
+                if wallpaper_info.get('category'):
+                    self.counters.increment_category(wallpaper_info['category'])
+            else:
+                await self.db_client.update_user_fetch_count(user_id)
+            
             await self.db_client.log_event(
                 level='INFO',
                 message=f"User {user_id} fetched wallpaper from {wallpaper_info.get('source', 'unknown')}",
@@ -99,14 +82,19 @@ class LastPerson07Queries:
             
             today_fetches = await self._get_today_fetches(user_id)
             
+            if self.counters:
+                total_fetches = self.counters.user_value(user, user_id)
+            else:
+                total_fetches = user.get('fetch_count', 0)
+            
             return {
                 'user_id': user_id,
                 'username': user.get('username', 'Unknown'),
                 'first_name': user.get('first_name', 'Unknown'),
                 'tier': user.get('tier', 'free'),
-                'total_fetches': user.get('fetch_count', 0),
+                'total_fetches': total_fetches,
                 'today_fetches': today_fetches,
-                'remaining_fetches': max(0, 5 - today_fetches) if user.get('tier') == 'free' else 'unlimited',
+                'remaining_fetches': max(0, self.quota.daily_limit - today_fetches) if user.get('tier') == 'free' else 'unlimited',
                 'join_date': user.get('join_date'),
                 'last_fetch': user.get('last_fetch_date'),
                 'banned': user.get('banned', False),
@@ -0,0 +1,170 @@
+"""
+LastPerson07Bot Quota Module
+Daily fetch quota kept in per-day usage documents that expire through a TTL index
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07QuotaEngine:
+    """Daily fetch allowance counted in usage_daily documents keyed by user and UTC day"""
+    
+    USAGE_COLLECTION = 'usage_daily'
+    
+    def __init__(self, db_client, daily_limit: int = 5, retention_days: int = 7):
+        """Initialize the quota engine"""
+        self.db_client = db_client
+        self.daily_limit = daily_limit
+        self.retention_days = retention_days
+        
+        # Quota statistics
+        self.stats = {
+            'granted': 0,
+            'denied': 0,
+            'refunded': 0,
+            'errors': 0,
+            'failed_open': 0
+        }
+    
+    async def ensure_indexes(self) -> bool:
+        """Create the TTL index that removes usage documents after the retention period"""
+        try:
+            await self._usage().create_index('expires_at', expireAfterSeconds=0)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error creating usage_daily TTL index: {e}")
+            return False
+    
+    async def acquire(self, user_id: int) -> Tuple[bool, float, Optional[str]]:
+        """Take one fetch from today's allowance; returns (allowed, remaining, UTC day taken from or None)"""
+        now = datetime.utcnow()
+        day = now.strftime('%Y-%m-%d')
+        
+        try:
+            # The plan lives on the user document (normally served from the user cache), so it is read
+            # alongside the free-limit update instead of before it and a fetch costs one round trip
+            user, usage = await asyncio.gather(
+                self.db_client.get_user(user_id),
+                self._take(user_id, day, now, self.daily_limit)
+            )
+            
+            if user and user.get('banned'):
+                if usage:
+                    await self._release(self._key(user_id, day))
+                self.stats['denied'] += 1
+                return False, 0, None
+            
+            if user and user.get('tier') == 'premium':
+                # Premium usage is still counted past the free limit, it just has no ceiling
+                if not usage:
+                    await self._take(user_id, day, now, None)
+                self.stats['granted'] += 1
+                return True, float('inf'), day  # Unlimited for premium
+            
+        except Exception as e:
+            # Fail open: a database hiccup should not lock every user out; at worst a few fetches go uncounted
+            self.stats['errors'] += 1
+            self.stats['failed_open'] += 1
+            logger.warning(f"⚠️ Fetch quota unavailable for user {user_id}, allowing the fetch: {e}")
+            return True, 0, None
+        
+        if not usage:
+            self.stats['denied'] += 1
+            return False, 0, None
+        
+        self.stats['granted'] += 1
+        return True, max(0, self.daily_limit - usage.get('count', 0)), day
+    
+    async def refund(self, user_id: int, day: str) -> None:
+        """Give back a fetch that was never delivered to the day acquire took it from"""
+        try:
+            if await self._release(self._key(user_id, day)):
+                self.stats['refunded'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Error refunding fetch quota for user {user_id}: {e}")
+    
+    async def check(self, user_id: int) -> Tuple[bool, float]:
+        """Check whether a fetch would be allowed without taking one; returns (allowed, remaining)"""
+        try:
+            user, count = await asyncio.gather(self.db_client.get_user(user_id), self._count(user_id))
+        except Exception as e:
+            # Same policy as acquire: report the fetch as allowed rather than locking the user out
+            self.stats['errors'] += 1
+            logger.warning(f"⚠️ Fetch quota unavailable for user {user_id}, reporting the fetch as allowed: {e}")
+            return True, 0
+        
+        if user and user.get('banned'):
+            return False, 0
+        
+        if user and user.get('tier') == 'premium':
+            return True, float('inf')  # Unlimited for premium
+        
+        remaining = max(0, self.daily_limit - count)
+        return remaining > 0, remaining
+    
+    async def today_count(self, user_id: int) -> int:
+        """Get today's fetch count with a single read by key"""
+        try:
+            return await self._count(user_id)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Error reading fetch quota for user {user_id}: {e}")
+            return 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get grant and denial counts"""
+        return {
+            'daily_limit': self.daily_limit,
+            **self.stats
+        }
+    
+    @staticmethod
+    def _key(user_id: int, day: Optional[str] = None) -> str:
+        """Build the usage document ID for a user and UTC day (today by default)"""
+        return f"{user_id}:{day or datetime.utcnow().strftime('%Y-%m-%d')}"
+    
+    async def _take(self, user_id: int, day: str, now: datetime, limit: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Count a fetch on a day's usage document while it is under limit; None when the limit is reached"""
+        key = self._key(user_id, day)
+        query = {'_id': key} if limit is None else {'_id': key, 'count': {'$lt': limit}}
+        update = {
+            '$inc': {'count': 1},
+            '$set': {'last_fetch': now},
+            '$setOnInsert': {
+                'user_id': user_id,
+                'day': day,
+                'expires_at': datetime(now.year, now.month, now.day) + timedelta(days=self.retention_days)
+            }
+        }
+        
+        try:
+            return await self._usage().find_one_and_update(
+                query, update, projection={'count': 1}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The document exists but is at the limit, or another fetch created it first
+            return await self._usage().find_one_and_update(
+                query, update, projection={'count': 1}, return_document=ReturnDocument.AFTER
+            )
+    
+    async def _count(self, user_id: int) -> int:
+        """Read today's fetch count by key"""
+        usage = await self._usage().find_one({'_id': self._key(user_id)}, {'count': 1})
+        return usage.get('count', 0) if usage else 0
+    
+    async def _release(self, key: str) -> bool:
+        """Take one fetch back off a usage document; False if there was nothing to take back"""
+        result = await self._usage().update_one({'_id': key, 'count': {'$gt': 0}}, {'$inc': {'count': -1}})
+        return bool(result.modified_count)
+    
+    def _usage(self):
+        """Get the daily usage collection"""
+        return self.db_client.database[self.db_client.COLLECTIONS.get('usage_daily', self.USAGE_COLLECTION)]
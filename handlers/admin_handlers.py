@@ -12,8 +12,11 @@ from telegram.ext import ContextTypes
 
 from utils.ui import LastPerson07UI
 from utils.reactions import LastPerson07Reactions
-import psutil
-import platform
+from utils.lazy import lazy_import
+
+# System probes load on the first /stats call, not at startup
+psutil = lazy_import('psutil')
+platform = lazy_import('platform')
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,21 @@ class AdminHandlers:
         self.db_client = db_client
         self.ui = LastPerson07UI()
         self.reactions = LastPerson07Reactions()
+        self.fetcher = None  # Injected by the bot for provider health reporting
+        self.image_worker = None  # Injected by the bot when image worker processes are enabled
+        self.user_cache = None  # Injected by the bot once the database is connected
+        
+        # Injected by the bot for cache and pipeline reporting in /stats
+        self.prefetch_pool = None
+        self.disk_cache = None
+        self.file_id_cache = None
+        self.duplicate_index = None
+        self.color_index = None
+        self.quality_scorer = None
+        self.quota_engine = None
+        self.counters = None
+        self.log_writer = None
+        self.http_client = None
     
     def register_handlers(self, application):
         """Register all admin command handlers"""
@@ -463,6 +481,16 @@ class AdminHandlers:
 💻 CPU: {cpu_percent}%
 🧠 RAM: {memory_percent}%
 💾 Disk: {disk_percent}%
+{image_worker_status}
+{user_cache_status}
+
+🔌 **Wallpaper Providers:**
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{provider_health}
+
+⚡ **Caches & Pipelines:**
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{pipeline_status}
 
 🔧 **System Info:**
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -480,7 +508,11 @@ class AdminHandlers:
                 disk_percent=psutil.disk_usage('/').percent,
                 os_name=platform.system(),
                 os_release=platform.release(),
-                python_version=platform.python_version()
+                python_version=platform.python_version(),
+                provider_health=self._format_provider_health(),
+                image_worker_status=self._format_image_worker_status(),
+                user_cache_status=self._format_user_cache_status(),
+                pipeline_status=self._format_pipeline_status()
             )
             
             return await update.message.reply_text(stats_text)
@@ -491,6 +523,146 @@ class AdminHandlers:
                 "❌ Sorry, couldn't retrieve statistics. Please try again later."
             )
     
+    def _format_image_worker_status(self) -> str:
+        """Format image worker pool load"""
+        if not self.image_worker:
+            return "🧵 Image Workers: disabled"
+        
+        status = self.image_worker.get_status()
+        return (
+            f"🧵 Image Workers: {status['workers']} | queue {status['pending']}/{status['max_pending']}"
+            f"{' ⚠️ saturated' if status['saturated'] else ''} | "
+            f"✅ {status['completed']} ⏱️ {status['timeouts']} 🚫 {status['rejected']}"
+        )
+    
+    def _format_user_cache_status(self) -> str:
+        """Format user profile cache size and hit ratio"""
+        if not self.user_cache:
+            return "👤 User Cache: disabled"
+        
+        stats = self.user_cache.get_stats()
+        return (
+            f"👤 User Cache: {stats['size']}/{stats['max_entries']} | hit {stats['hit_ratio']:.0%} | "
+            f"expired {stats['expired']} | invalidated {stats['invalidations']} | evicted {stats['evictions']}"
+        )
+    
+    def _format_pipeline_status(self) -> str:
+        """Format download, cache, index and database writer statistics"""
+        lines = []
+        
+        if self.fetcher:
+            downloads = self.fetcher.get_download_stats()
+            in_progress = downloads['in_progress'].values()
+            lines.append(
+                f"⬇️ Downloads: {downloads['downloads']} | {downloads['bytes_transferred'] / (1024 * 1024):.1f}MB | "
+                f"oversize {downloads['aborted_oversize']} | bad header {downloads['rejected_header']} | "
+                f"in flight {len(in_progress)} ({sum(p['received'] for p in in_progress) / 1024:.0f}KB)"
+            )
+        
+        if self.http_client:
+            http = self.http_client.get_stats()
+            lines.append(
+                f"🌐 HTTP Pool: {http['limit']} conns, {http['limit_per_host']}/host" if http['open'] else "🌐 HTTP Pool: closed"
+            )
+        
+        if self.prefetch_pool:
+            prefetch = self.prefetch_pool.get_status()
+            lines.append(
+                f"🗂️ Prefetch: {sum(prefetch['sizes'].values())} ready | "
+                f"{prefetch['memory_used_mb']:.1f}/{prefetch['memory_budget_mb']:.0f}MB | hit {prefetch['hit_ratio']:.0%} | "
+                f"dupes {prefetch['duplicates']} | low quality {prefetch['low_quality']}"
+            )
+        
+        if self.disk_cache:
+            disk = self.disk_cache.get_stats()
+            lines.append(
+                f"💽 Disk Cache: {disk['images']} images | {disk['used_mb']:.0f}/{disk['budget_mb']:.0f}MB | "
+                f"hit {disk['hit_ratio']:.0%} | evicted {disk['evictions']}"
+            )
+        
+        if self.file_id_cache:
+            file_ids = self.file_id_cache.get_stats()
+            lines.append(
+                f"🆔 File IDs: {file_ids['size']}/{file_ids['max_entries']} | hit {file_ids['hit_ratio']:.0%} | "
+                f"stored {file_ids['stored']}"
+            )
+        
+        if self.duplicate_index:
+            dedup = self.duplicate_index.get_stats()
+            lines.append(
+                f"🪞 Dedup: {dedup['size']} hashes | duplicates {dedup['duplicates']}/{dedup['lookups']} | "
+                f"avg candidates {dedup['avg_candidates']:.1f}"
+            )
+        
+        if self.color_index:
+            colors = self.color_index.get_stats()
+            lines.append(f"🎨 Colour Index: {colors['size']} | matched {colors['matches']}/{colors['queries']}")
+        
+        if self.quality_scorer:
+            quality = self.quality_scorer.get_status()
+            lines.append(
+                f"🔍 Quality: scored {quality['scored']} | low {quality['low_quality']} | "
+                f"failed {quality['failed']} | min {quality['min_score']:.2f}"
+            )
+        
+        if self.quota_engine:
+            quota = self.quota_engine.get_stats()
+            lines.append(
+                f"🎟️ Quota: granted {quota['granted']} | denied {quota['denied']} | "
+                f"refunded {quota['refunded']} | errors {quota['errors']} (allowed {quota['failed_open']})"
+            )
+        
+        if self.counters:
+            counters = self.counters.get_stats()
+            lines.append(
+                f"🧮 Counters: pending {counters['pending']} | merged {counters['merge_ratio']:.0%} | "
+                f"failed flushes {counters['failed_flushes']}"
+            )
+        
+        if self.log_writer:
+            logs = self.log_writer.get_stats()
+            lines.append(
+                f"📝 Log Writer: queue {logs['pending']}/{logs['max_queue']} | written {logs['written']} | "
+                f"dropped {logs['dropped']}"
+            )
+        
+        return '\n'.join(lines) or "No pipeline components running"
+    
+    def _format_provider_health(self) -> str:
+        """Format circuit breaker state for each wallpaper provider"""
+        health = self.fetcher.get_provider_health() if self.fetcher else {}
+        
+        if not health:
+            return "No providers configured"
+        
+        state_emojis = {'closed': '🟢', 'half_open': '🟡', 'open': '🔴'}
+        lines = []
+        
+        for name, status in health.items():
+            line = (
+                f"{state_emojis.get(status['state'], '⚪')} {name.title()}: {status['state']} | "
+                f"health {status['health_score']:.2f} | "
+                f"✅ {status['total_successes']} ❌ {status['total_failures']}"
+            )
+            quota = status.get('quota') or {}
+            if quota.get('remaining') is not None:
+                line += f" | quota {quota['remaining']}/{quota['limit'] or '?'}"
+                if quota.get('reset_in') is not None:
+                    line += f" (resets in {quota['reset_in'] // 60}m)"
+            if quota and not quota.get('available', True):
+                line += " | ⏳ throttled"
+            if status['state'] != 'closed' and status['last_error']:
+                line += f" | last error: {status['last_error'][:40]}"
+            lines.append(line)
+        
+        coalescing = self.fetcher.get_coalescing_stats()
+        lines.append(
+            f"🔁 Coalesced: queries {coalescing['provider_queries']['dedup_ratio']:.0%} | "
+            f"downloads {coalescing['downloads']['dedup_ratio']:.0%}"
+        )
+        
+        return '\n'.join(lines)
+    
     async def _maintenance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Message:
         """Handle /maintenance command"""
         try:
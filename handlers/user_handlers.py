@@ -9,11 +9,15 @@ from typing import Optional
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Message
 from telegram.ext import ContextTypes, ConversationHandler
+from telegram.error import BadRequest
 
 from utils.ui import LastPerson07UI
 from utils.reactions import LastPerson07Reactions
 from utils.metadata import LastPerson07ImageProcessor
-from utils.fetcher import LastPerson07WallpaperFetcher
+from utils.placeholders import LastPerson07PlaceholderPool
+from utils.image_worker import LastPerson07ImageWorkerSaturated
+from utils.file_id_cache import LastPerson07FileIdCache
+from utils.color_index import LastPerson07ColorIndex
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +31,16 @@ class UserHandlers:
         self.ui = LastPerson07UI()
         self.reactions = LastPerson07Reactions()
         self.image_processor = LastPerson07ImageProcessor()
-        self.fetcher = None  # Will be initialized with db_client
+        self.placeholders = LastPerson07PlaceholderPool(config.PLACEHOLDER_DIR)
+        self.fetcher = None  # Injected by the bot with the shared HTTP client
+        self.prefetch_pool = None  # Injected by the bot when prefetching is enabled
+        self.file_id_cache = None  # Injected by the bot once the database is connected
+        self.duplicate_index = None  # Injected by the bot for near-duplicate suppression
+        self.duplicate_retries = 2
+        self.color_index = None  # Injected by the bot for colour and brightness filters
+        self.color_match_limit = 10
+        self.quota_engine = None  # Injected by the bot once the database is connected
+        self.counters = None  # Injected by the bot to batch fetch counters
     
     def register_handlers(self, application):
         """Register all user command handlers"""
@@ -135,19 +148,25 @@ class UserHandlers:
     
     async def _fetch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Message:
         """Handle /fetch command with beautiful UI"""
+        # UTC day a fetch was taken from, so failures give it back to that day even after midnight
+        quota_day = None
+        
         try:
             user = update.effective_user
             chat_id = update.effective_chat.id
             
-            # Parse category
-            category = ' '.join(context.args) if context.args else 'nature'
+            # Parse category and optional colour/brightness filters (e.g. /fetch nature dark, /fetch blue)
+            words, color, brightness = LastPerson07ColorIndex.parse_filters(context.args or [])
+            category = ' '.join(words) if words else 'nature'
             
             logger.info(f"🖼️ User {user.username} ({user.id}) requested wallpaper: {category}")
             
             # Check user's fetch allowance if database available
             can_fetch = True
-            if self.db_client:
-                can_fetch, remaining = await self._check_fetch_allowance(user.id)
+            is_premium = False
+            if self.quota_engine:
+                can_fetch, remaining, quota_day = await self._check_fetch_allowance(user.id)
+                is_premium = remaining == float('inf')
                 
                 if not can_fetch:
                     limit_text = self.ui.get_fetch_limit_message(self.config.FREE_FETCH_LIMIT)
@@ -172,68 +191,133 @@ class UserHandlers:
             # Send typing action
             await context.bot.send_chat_action(chat_id=chat_id, action="typing")
             
-            # Initialize fetcher if needed
-            if not self.fetcher and self.db_client:
-                self.fetcher = LastPerson07WallpaperFetcher(self.db_client, self.config)
-                await self.fetcher.initialize()
-            
-            # Fetch wallpaper
-            await context.bot.send_chat_action(chat_id=chat_id, action="upload_photo")
-            
-            wallpaper_info = None
-            if self.fetcher:
-                wallpaper_info = await self.fetcher.fetch_wallpaper(category)
+            # Serve from the prefetch pool when a wallpaper is ready
+            used_placeholder = False
+            prefetched = None
+            
+            # Filtered requests are served from cached wallpapers whose palette matches
+            if color or brightness:
+                prefetched = await self._get_color_match(color, brightness, category if words else None)
+                if prefetched:
+                    category = prefetched['category']
+                else:
+                    logger.info(f"🎨 No cached wallpaper matches {color or ''} {brightness or ''}, fetching {category}")
+            
+            if not prefetched and self.prefetch_pool:
+                prefetched = self.prefetch_pool.get(category)
+            
+            if prefetched:
+                wallpaper_info = prefetched['wallpaper_info']
+                image_data = prefetched['image_data']
+                metadata = prefetched['metadata']
+                file_id = await self._get_cached_file_id(wallpaper_info)
+                logger.debug(f"⚡ Serving prefetched {category} wallpaper to user {user.id}")
             else:
-                # Create mock wallpaper info for demo
-                wallpaper_info = {
-                    'url': 'https://picsum.photos/1920/1080',
-                    'source': 'demo',
-                    'width': 1920,
-                    'height': 1080,
-                    'description': 'Beautiful nature wallpaper',
-                    'photographer': 'Demo User',
-                    'download_url': 'https://picsum.photos/1920/1080'
-                }
-            
-            if not wallpaper_info:
-                error_text = self.ui.get_fetch_error_message(category)
+                # Fetch wallpaper
+                await context.bot.send_chat_action(chat_id=chat_id, action="upload_photo")
                 
-                keyboard = [
-                    [
-                        InlineKeyboardButton(
-                            text="🔄 Try Again 🔄",
-                            callback_data=f"fetch_{category}"
-                        ),
-                        InlineKeyboardButton(
-                            text="📂 Other Categories 📚",
-                            callback_data="categories_main"
-                        )
-                    ]
-                ]
+                # Try another candidate when one turns out to be a near-duplicate of an earlier wallpaper
+                for attempt in range(self.duplicate_retries + 1):
+                    wallpaper_info = None
+                    if self.fetcher:
+                        wallpaper_info = await self.fetcher.fetch_wallpaper(category, premium=is_premium)
+                    else:
+                        # Create mock wallpaper info for demo
+                        wallpaper_info = {
+                            'url': 'https://picsum.photos/1920/1080',
+                            'source': 'demo',
+                            'width': 1920,
+                            'height': 1080,
+                            'description': 'Beautiful nature wallpaper',
+                            'photographer': 'Demo User',
+                            'download_url': 'https://picsum.photos/1920/1080'
+                        }
+                    
+                    if not wallpaper_info:
+                        error_text = self.ui.get_fetch_error_message(category)
+                        
+                        keyboard = [
+                            [
+                                InlineKeyboardButton(
+                                    text="🔄 Try Again 🔄",
+                                    callback_data=f"fetch_{category}"
+                                ),
+                                InlineKeyboardButton(
+                                    text="📂 Other Categories 📚",
+                                    callback_data="categories_main"
+                                )
+                            ]
+                        ]
+                        
+                        reply_markup = InlineKeyboardMarkup(keyboard)
+                        await self._refund_fetch(user.id, quota_day)
+                        return await update.message.reply_text(error_text, reply_markup=reply_markup)
+                    
+                    # Reuse an earlier upload of the same image instead of downloading it again
+                    file_id = await self._get_cached_file_id(wallpaper_info)
+                    image_data = None
+                    
+                    if not file_id:
+                        # Download image
+                        if self.fetcher:
+                            image_data = await self.fetcher.download_image(
+                                wallpaper_info['url'],
+                                wallpaper_info['source'],
+                                header_check=self.image_processor.check_header
+                            )
+                        
+                        if not image_data:
+                            # Use a local placeholder image instead of another network round trip
+                            used_placeholder = True
+                            wallpaper_info = self.placeholders.get_wallpaper_info(category)
+                            image_data = await self.placeholders.get_image()
+                            
+                            if not image_data:
+                                logger.error(f"❌ No image or placeholder available for user {user.id}")
+                                await self._refund_fetch(user.id, quota_day)
+                                return await update.message.reply_text(
+                                    self.ui.get_fetch_error_message(category),
+                                    reply_markup=InlineKeyboardMarkup([[
+                                        InlineKeyboardButton(text="🔄 Try Again 🔄", callback_data=f"fetch_{category}")
+                                    ]])
+                                )
+                        
+                        # Re-encode oversized or exotic images instead of discarding them
+                        try:
+                            image_data = await self.image_processor.prepare_for_telegram(image_data) or image_data
+                        except LastPerson07ImageWorkerSaturated as e:
+                            logger.warning(f"⚠️ Skipping transcode for user {user.id}: {e}")
+                        
+                        # Validate image quality
+                        is_valid = await self.image_processor.validate_image(image_data)
+                        if not is_valid:
+                            await self._refund_fetch(user.id, quota_day)
+                            return await update.message.reply_text(
+                                "❌ The image doesn't meet our quality standards. Please try another."
+                            )
+                        
+                        # Extract image metadata; when the image workers are saturated, send without it
+                        try:
+                            metadata = await self.image_processor.extract_metadata(image_data)
+                        except LastPerson07ImageWorkerSaturated as e:
+                            logger.warning(f"⚠️ Skipping metadata for user {user.id}: {e}")
+                            metadata = {}
+                    
+                    if file_id or used_placeholder or not self._is_near_duplicate(wallpaper_info, metadata):
+                        break
+                    if attempt < self.duplicate_retries:
+                        logger.info(f"🪞 Skipping near-duplicate {category} wallpaper for user {user.id}")
+                else:
+                    # Every candidate was a near-duplicate; send the last one without charging the allowance
+                    logger.info(f"🪞 Only near-duplicate {category} wallpapers left, sending one free to user {user.id}")
+                    await self._refund_fetch(user.id, quota_day)
+                    quota_day = None
                 
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                return await update.message.reply_text(error_text, reply_markup=reply_markup)
-            
-            # Download image
-            image_data = None
-            if self.fetcher:
-                image_data = await self.fetcher.download_image(wallpaper_info['url'])
-            
-            if not image_data:
-                # Use placeholder image for demo
-                import requests
-                response = requests.get('https://picsum.photos/1920/1080')
-                image_data = response.content
-            
-            # Validate image quality
-            is_valid = await self.image_processor.validate_image(image_data)
-            if not is_valid:
-                return await update.message.reply_text(
-                    "❌ The image doesn't meet our quality standards. Please try another."
-                )
-            
-            # Extract image metadata
-            metadata = await self.image_processor.extract_metadata(image_data)
+                # Make the new wallpaper findable by colour
+                if self.color_index and not file_id and not used_placeholder:
+                    self.color_index.add(
+                        LastPerson07FileIdCache.make_key(wallpaper_info), category, wallpaper_info, metadata
+                    )
             
             # Create beautiful caption
             caption = f"""
@@ -278,17 +362,25 @@ class UserHandlers:
             reply_markup = InlineKeyboardMarkup(keyboard)
             
             # Send beautiful wallpaper
-            sent_message = await context.bot.send_photo(
-                chat_id=chat_id,
-                photo=image_data,
+            sent_message = await self._send_wallpaper_photo(
+                context,
+                chat_id,
+                wallpaper_info,
+                file_id,
+                image_data,
                 caption=caption,
                 reply_markup=reply_markup,
                 parse_mode='Markdown'
             )
+            quota_day = None
+            
+            # Remember the uploaded file_id so repeats skip download and upload
+            if not file_id and not used_placeholder:
+                await self._remember_file_id(wallpaper_info, sent_message)
             
             # Record the fetch if database available
             if self.db_client:
-                await self._record_wallpaper_fetch(user.id, wallpaper_info)
+                await self._record_wallpaper_fetch(user.id, wallpaper_info, category)
             
             # Set random reaction
             await self.reactions.set_random_reaction(
@@ -302,6 +394,7 @@ class UserHandlers:
             
         except Exception as e:
             logger.error(f"❌ Error in fetch command: {e}")
+            await self._refund_fetch(update.effective_user.id, quota_day)
             return await update.message.reply_text(
                 "❌ Sorry, I encountered an error. Please try again later."
             )
@@ -394,7 +487,10 @@ class UserHandlers:
             tier = user_data.get('tier', 'free') if user_data else 'free'
             
             # Get statistics
-            total_fetches = user_data.get('fetch_count', 0) if user_data else 0
+            if self.counters:
+                total_fetches = self.counters.user_value(user_data, user.id)
+            else:
+                total_fetches = user_data.get('fetch_count', 0) if user_data else 0
             today_fetches = await self._get_today_fetches(user.id) if self.db_client else 0
             join_date = user_data.get('join_date') if user_data else None
             
@@ -921,48 +1017,138 @@ class UserHandlers:
             if not user_data:
                 await self.db_client.create_user(user_id, username, first_name)
     
-    async def _check_fetch_allowance(self, user_id: int) -> tuple[bool, int]:
-        """Check if user can fetch wallpapers"""
-        user_data = await self.db_client.get_user(user_id)
-        
-        if not user_data:
-            return True, self.config.FREE_FETCH_LIMIT
+    async def _check_fetch_allowance(self, user_id: int) -> tuple[bool, int, Optional[str]]:
+        """Check if user can fetch wallpapers, taking one fetch from today's allowance and returning its day"""
+        # Limit check and increment happen in one atomic update of today's usage document
+        return await self.quota_engine.acquire(user_id)
+    
+    async def _refund_fetch(self, user_id: int, quota_day: Optional[str]) -> None:
+        """Give back a fetch that was taken but not delivered"""
+        if quota_day and self.quota_engine:
+            await self.quota_engine.refund(user_id, quota_day)
+    
+    async def _get_today_fetches(self, user_id: int) -> int:
+        """Get today's fetch count for user"""
+        if not self.db_client or not self.quota_engine:
+            return 0
         
-        if user_data.get('banned', False):
-            return False, 0
+        return await self.quota_engine.today_count(user_id)
+    
+    async def _get_cached_file_id(self, wallpaper_info: dict) -> Optional[str]:
+        """Look up the Telegram file_id of an already uploaded wallpaper"""
+        if not self.file_id_cache:
+            return None
         
-        if user_data.get('tier') == 'premium':
-            return True, float('inf')  # Unlimited for premium
+        return await self.file_id_cache.get(self.file_id_cache.make_key(wallpaper_info))
+    
+    def _is_near_duplicate(self, wallpaper_info: dict, metadata: dict) -> bool:
+        """Check a wallpaper's perceptual hash against images indexed under other keys"""
+        if not self.duplicate_index or 'dhash' not in metadata:
+            return False
         
-        # Check daily limit for free users
-        today_fetches = await self._get_today_fetches(user_id)
-        remaining = self.config.FREE_FETCH_LIMIT - today_fetches
+        key = LastPerson07FileIdCache.make_key(wallpaper_info)
+        if not key:
+            return False
         
-        return remaining > 0, max(0, remaining)
+        return self.duplicate_index.check_and_add(metadata['dhash'], key) is not None
     
-    async def _get_today_fetches(self, user_id: int) -> int:
-        """Get today's fetch count for user"""
-        if not self.db_client:
-            return 0
+    async def _get_color_match(
+        self,
+        color: Optional[str],
+        brightness: Optional[str],
+        category: Optional[str]
+    ) -> Optional[dict]:
+        """Pick one of the closest colour-indexed wallpapers, shaped like a prefetched item"""
+        if not self.color_index:
+            return None
+        
+        matches = self.color_index.query(color, brightness, category, limit=self.color_match_limit)
+        
+        # Vary the answer among the best matches; give up after a few failed downloads
+        for entry in random.sample(matches, min(3, len(matches))):
+            wallpaper_info = entry['wallpaper_info']
+            item = {'wallpaper_info': wallpaper_info, 'category': entry['category'], 'image_data': None, 'metadata': {}}
+            
+            if await self._get_cached_file_id(wallpaper_info):
+                return item
+            
+            if not self.fetcher:
+                continue
+            
+            # Usually a disk cache hit, since indexed wallpapers were downloaded before
+            image_data = await self.fetcher.download_image(
+                wallpaper_info['url'],
+                wallpaper_info['source'],
+                header_check=self.image_processor.check_header
+            )
+            if not image_data:
+                continue
             
-        user_data = await self.db_client.get_user(user_id)
-        if not user_data:
-            return 0
+            try:
+                item['image_data'] = await self.image_processor.prepare_for_telegram(image_data) or image_data
+            except LastPerson07ImageWorkerSaturated:
+                item['image_data'] = image_data
+            return item
         
-        today = datetime.utcnow().date()
-        last_fetch = user_data.get('last_fetch_date')
+        return None
+    
+    async def _send_wallpaper_photo(
+        self,
+        context: ContextTypes.DEFAULT_TYPE,
+        chat_id: int,
+        wallpaper_info: dict,
+        file_id: Optional[str],
+        image_data: Optional[bytes],
+        **kwargs
+    ) -> Message:
+        """Send a wallpaper by cached file_id, re-uploading the image when Telegram rejects the file_id"""
+        if not file_id:
+            return await context.bot.send_photo(chat_id=chat_id, photo=image_data, **kwargs)
         
-        if last_fetch and last_fetch.date() == today:
-            return user_data.get('fetch_count', 0)
-        else:
-            # Reset count if it's a new day
-            await self.db_client.update_user(user_id, {'fetch_count': 0})
-            return 0
+        try:
+            return await context.bot.send_photo(chat_id=chat_id, photo=file_id, **kwargs)
+        except BadRequest as e:
+            logger.warning(f"⚠️ Cached file_id rejected for {wallpaper_info.get('url')}, re-uploading: {e}")
+            await self.file_id_cache.invalidate(self.file_id_cache.make_key(wallpaper_info))
+            
+            if not image_data and self.fetcher:
+                image_data = await self.fetcher.download_image(
+                    wallpaper_info['url'],
+                    wallpaper_info['source'],
+                    header_check=self.image_processor.check_header
+                )
+                if image_data:
+                    try:
+                        image_data = await self.image_processor.prepare_for_telegram(image_data) or image_data
+                    except LastPerson07ImageWorkerSaturated as saturated:
+                        logger.warning(f"⚠️ Skipping transcode of re-upload: {saturated}")
+            
+            if not image_data:
+                raise
+        
+        sent_message = await context.bot.send_photo(chat_id=chat_id, photo=image_data, **kwargs)
+        await self._remember_file_id(wallpaper_info, sent_message)
+        return sent_message
     
-    async def _record_wallpaper_fetch(self, user_id: int, wallpaper_info: dict) -> None:
+    async def _remember_file_id(self, wallpaper_info: dict, sent_message: Message) -> None:
+        """Store the file_id Telegram assigned to an uploaded wallpaper"""
+        if self.file_id_cache and sent_message.photo:
+            await self.file_id_cache.set(
+                self.file_id_cache.make_key(wallpaper_info),
+                sent_message.photo[-1].file_id
+            )
+    
+    async def _record_wallpaper_fetch(self, user_id: int, wallpaper_info: dict, category: str = None) -> None:
         """Record wallpaper fetch in database"""
+        # Today's count was already taken by the quota engine; lifetime and category totals are written behind
+        if self.counters:
+            self.counters.increment_user(user_id)
+            if category:
+                self.counters.increment_category(category)
+        
         if self.db_client:
-            await self.db_client.update_user_fetch_count(user_id)
+            if not self.counters:
+                await self.db_client.update_user_fetch_count(user_id)
             await self.db_client.log_event(
                 level='INFO',
                 message=f"User {user_id} fetched wallpaper from {wallpaper_info.get('source', 'unknown')}",
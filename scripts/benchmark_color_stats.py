@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+LastPerson07Bot Color Stats Benchmark
+Compares full-resolution ImageStat against the reduced-decode NumPy colour statistics
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Callable
+
+from PIL import Image, ImageDraw, ImageFilter, ImageStat
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.metadata import LastPerson07ImageProcessor
+
+# Maximum allowed difference (0-255 levels) between reduced and full-resolution stats
+MEAN_TOLERANCE = 1.5
+STD_TOLERANCE = 3.0
+
+def make_sample_image(width: int, height: int) -> bytes:
+    """Render a photo-like JPEG with smooth gradients and soft shapes"""
+    image = Image.merge('RGB', (
+        Image.linear_gradient('L').resize((width, height)),
+        Image.radial_gradient('L').resize((width, height)),
+        Image.linear_gradient('L').rotate(90).resize((width, height))
+    ))
+    
+    draw = ImageDraw.Draw(image)
+    for index in range(12):
+        x, y = (index * 379) % width, (index * 211) % height
+        radius = min(width, height) // 6
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=(40 * index % 255, 200, 90))
+    image = image.filter(ImageFilter.GaussianBlur(radius=width // 200))
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+def full_resolution_stats(image_data: bytes) -> Dict[str, float]:
+    """Colour statistics the way extract_metadata computed them before"""
+    stat = ImageStat.Stat(Image.open(io.BytesIO(image_data)))
+    return {
+        'mean_red': stat.mean[0],
+        'mean_green': stat.mean[1],
+        'mean_blue': stat.mean[2],
+        'std_red': stat.stddev[0],
+        'std_green': stat.stddev[1],
+        'std_blue': stat.stddev[2]
+    }
+
+def time_call(func: Callable[[], Dict[str, float]], rounds: int) -> float:
+    """Get the best wall time of several rounds in milliseconds"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main() -> int:
+    """Run the benchmark and check the reduced stats stay within tolerance"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('images', nargs='*', help='JPEG/PNG/WebP files to benchmark (a synthetic 4K image by default)')
+    parser.add_argument('--rounds', type=int, default=5, help='timing rounds per method')
+    args = parser.parse_args()
+    
+    processor = LastPerson07ImageProcessor()
+    samples = {path: Path(path).read_bytes() for path in args.images} or {'synthetic 3840x2160': make_sample_image(3840, 2160)}
+    failed = False
+    
+    for name, image_data in samples.items():
+        full = full_resolution_stats(image_data)
+        reduced = processor.compute_color_stats(Image.open(io.BytesIO(image_data)))
+        
+        full_ms = time_call(lambda: full_resolution_stats(image_data), args.rounds)
+        reduced_ms = time_call(lambda: processor.compute_color_stats(Image.open(io.BytesIO(image_data))), args.rounds)
+        
+        mean_error = max(abs(full[key] - reduced[key]) for key in full if key.startswith('mean'))
+        std_error = max(abs(full[key] - reduced[key]) for key in full if key.startswith('std'))
+        within = mean_error <= MEAN_TOLERANCE and std_error <= STD_TOLERANCE
+        failed = failed or not within
+        
+        print(f"📊 {name}")
+        print(f"   full-res ImageStat: {full_ms:8.1f} ms")
+        print(f"   reduced NumPy:      {reduced_ms:8.1f} ms  ({full_ms / reduced_ms:.1f}x faster)")
+        print(f"   max error: mean {mean_error:.2f}, std {std_error:.2f} {'✅' if within else '❌'}")
+    
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+LastPerson07Bot Import Time Report
+Runs a fresh interpreter with -X importtime and summarises where cold-start import time goes
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# "import time:       self [us] |  cumulative | imported package"
+LINE_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+def run_importtime(module: str) -> List[Tuple[int, int, int, str]]:
+    """Import a module in a child interpreter and parse its -X importtime log"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    
+    if result.returncode != 0:
+        # Still report what was imported before the failure
+        last_error = result.stderr.strip().splitlines()[-1:] or ['unknown error']
+        print(f"⚠️ import {module} failed: {last_error[0]}")
+    
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return entries
+
+def summarise(entries: List[Tuple[int, int, int, str]]) -> Dict[str, int]:
+    """Sum self time per top-level package, in microseconds"""
+    totals: Dict[str, int] = {}
+    for self_us, _, _, name in entries:
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+def main() -> int:
+    """Print the slowest top-level packages and direct imports of a module"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('module', nargs='?', default='app', help='module to import (default: app)')
+    parser.add_argument('--top', type=int, default=15, help='rows to show per table')
+    args = parser.parse_args()
+    
+    entries = run_importtime(args.module)
+    if not entries:
+        print("❌ No import timings captured")
+        return 1
+    
+    total_us = sum(self_us for self_us, _, _, _ in entries)
+    print(f"📦 import {args.module}: {len(entries)} modules, {total_us / 1000:.1f} ms total")
+    
+    print("\n🐢 Slowest packages (self time, all submodules)")
+    for package, self_us in sorted(summarise(entries).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   {self_us / 1000:8.1f} ms  {package}")
+    
+    # Imports made directly by the module, i.e. one level below it in the import tree
+    target_level = next((level for _, _, level, name in reversed(entries) if name == args.module), 0)
+    direct = [(cumulative_us, name) for _, cumulative_us, level, name in entries if level == target_level + 1]
+    
+    print(f"\n🔗 Slowest direct imports of {args.module} (cumulative)")
+    for cumulative_us, name in sorted(direct, reverse=True)[:args.top]:
+        print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Shared test doubles: an in-memory stand-in for the motor collections and database client
+"""
+
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+class FakeCollection:
+    """Async collection supporting the filters and update operators the bot uses"""
+    
+    def __init__(self):
+        """Initialize an empty collection"""
+        self.docs = {}
+        self.indexes = []
+        
+        # Set to an exception to make every call fail; set gate to an Event to hold bulk writes open
+        self.error = None
+        self.gate = None
+    
+    async def create_index(self, keys, **kwargs):
+        """Record an index"""
+        self._check()
+        self.indexes.append((keys, kwargs))
+        return keys
+    
+    async def find_one(self, query, projection=None):
+        """Get a copy of the first matching document"""
+        self._check()
+        doc = self._find(query)
+        return copy.deepcopy(doc) if doc else None
+    
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        """Update the first matching document, inserting one on upsert; returns the updated document"""
+        self._check()
+        doc = self._find(query)
+        
+        if doc is None:
+            if not upsert:
+                return None
+            if query.get('_id') in self.docs:
+                # MongoDB reports an upsert whose filter misses an existing _id as a duplicate key
+                from pymongo.errors import DuplicateKeyError
+                raise DuplicateKeyError('duplicate key')
+            doc = self._insert(query, update)
+        else:
+            self._apply(doc, update)
+        
+        return copy.deepcopy(doc)
+    
+    async def update_one(self, query, update, upsert=False):
+        """Update the first matching document"""
+        self._check()
+        doc = self._find(query)
+        
+        if doc is None:
+            if upsert:
+                self._insert(query, update)
+            return SimpleNamespace(modified_count=0, upserted_id=query.get('_id') if upsert else None)
+        
+        self._apply(doc, update)
+        return SimpleNamespace(modified_count=1, upserted_id=None)
+    
+    async def insert_many(self, documents, ordered=True):
+        """Insert documents, assigning sequential IDs"""
+        self._check()
+        for document in documents:
+            self.docs[len(self.docs)] = copy.deepcopy(document)
+        return SimpleNamespace(inserted_ids=list(range(len(self.docs) - len(documents), len(self.docs))))
+    
+    async def bulk_write(self, operations, ordered=True):
+        """Apply UpdateOne operations"""
+        if self.gate:
+            await self.gate.wait()
+        self._check()
+        
+        for operation in operations:
+            await self.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+        return SimpleNamespace(modified_count=len(operations))
+    
+    def _check(self):
+        """Raise the configured failure"""
+        if self.error:
+            raise self.error
+    
+    def _find(self, query):
+        """Get the first stored document matching a query"""
+        for doc in self.docs.values():
+            if all(self._matches(doc.get(field), condition) for field, condition in query.items()):
+                return doc
+        return None
+    
+    @staticmethod
+    def _matches(value, condition):
+        """Check a field value against an equality or $lt/$gt/$ne condition"""
+        if not isinstance(condition, dict):
+            return value == condition
+        
+        checks = {
+            '$lt': lambda bound: value is not None and value < bound,
+            '$gt': lambda bound: value is not None and value > bound,
+            '$ne': lambda bound: value != bound
+        }
+        return all(checks[operator](bound) for operator, bound in condition.items())
+    
+    def _insert(self, query, update):
+        """Insert a document built from a query's equality fields and an update"""
+        doc = {field: value for field, value in query.items() if not isinstance(value, dict)}
+        doc.update(update.get('$setOnInsert', {}))
+        self._apply(doc, update)
+        self.docs[doc['_id']] = doc
+        return doc
+    
+    @staticmethod
+    def _apply(doc, update):
+        """Apply $inc, $set and $max to a document"""
+        for field, amount in update.get('$inc', {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        doc.update(update.get('$set', {}))
+        for field, value in update.get('$max', {}).items():
+            if doc.get(field) is None or value > doc[field]:
+                doc[field] = value
+
+class FakeDatabase(dict):
+    """Collections by name, created on first use"""
+    
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+class FakeDatabaseClient:
+    """Database client exposing what the quota engine and counter aggregator use"""
+    
+    COLLECTIONS = {'users': 'users'}
+    
+    def __init__(self):
+        """Initialize with an empty database"""
+        self.database = FakeDatabase()
+        self.invalidated = []
+    
+    @property
+    def users(self):
+        """Get the users collection"""
+        return self.database['users']
+    
+    def add_user(self, user_id, **fields):
+        """Store a user document"""
+        self.users.docs[user_id] = {'_id': user_id, **fields}
+    
+    async def get_user(self, user_id):
+        """Get a user document by ID"""
+        return await self.users.find_one({'_id': user_id})
+    
+    def invalidate_user(self, user_id):
+        """Record a cache invalidation"""
+        self.invalidated.append(user_id)
+
+@pytest.fixture
+def db_client():
+    """Provide a fresh in-memory database client"""
+    return FakeDatabaseClient()
@@ -0,0 +1,103 @@
+"""
+Tests for the LRU+TTL user cache
+"""
+
+import asyncio
+
+from db.cached_client import LastPerson07CachedDatabaseClient
+
+class CountingClient:
+    """Database client counting user reads and applying updates to nested documents"""
+    
+    def __init__(self):
+        """Initialize with one user"""
+        self.users = {1: {'_id': 1, 'tier': 'free', 'settings': {'notifications': True, 'language': 'en'}}}
+        self.reads = 0
+    
+    async def get_user(self, user_id):
+        """Get a copy of a stored user"""
+        self.reads += 1
+        user = self.users.get(user_id)
+        return {**user, 'settings': dict(user['settings'])} if user else None
+    
+    async def update_user(self, user_id, updates):
+        """Apply top-level and dotted-path updates"""
+        for key, value in updates.items():
+            target = self.users[user_id]
+            *parents, field = key.split('.')
+            for parent in parents:
+                target = target[parent]
+            target[field] = value
+        return True
+
+def test_repeat_reads_are_served_from_memory():
+    async def run():
+        client = CountingClient()
+        cached = LastPerson07CachedDatabaseClient(client, ttl_seconds=60)
+        
+        for _ in range(3):
+            assert (await cached.get_user(1))['tier'] == 'free'
+        
+        assert client.reads == 1
+        assert cached.get_stats()['hits'] == 2
+    
+    asyncio.run(run())
+
+def test_expired_and_evicted_entries_are_reread():
+    async def run():
+        client = CountingClient()
+        client.users[2] = {'_id': 2, 'tier': 'free', 'settings': {}}
+        
+        expired = LastPerson07CachedDatabaseClient(client, ttl_seconds=0)
+        await expired.get_user(1)
+        await expired.get_user(1)
+        assert client.reads == 2
+        
+        bounded = LastPerson07CachedDatabaseClient(client, max_entries=1)
+        await bounded.get_user(1)
+        await bounded.get_user(2)
+        await bounded.get_user(1)
+        assert client.reads == 5
+        assert bounded.get_stats()['evictions'] == 2
+    
+    asyncio.run(run())
+
+def test_plain_update_is_merged_into_the_cached_copy():
+    async def run():
+        client = CountingClient()
+        cached = LastPerson07CachedDatabaseClient(client)
+        await cached.get_user(1)
+        
+        await cached.update_user(1, {'tier': 'premium'})
+        
+        assert (await cached.get_user(1))['tier'] == 'premium'
+        assert client.reads == 1
+    
+    asyncio.run(run())
+
+def test_dotted_update_invalidates_instead_of_merging():
+    async def run():
+        client = CountingClient()
+        cached = LastPerson07CachedDatabaseClient(client)
+        await cached.get_user(1)
+        
+        await cached.update_user(1, {'settings.notifications': False})
+        user = await cached.get_user(1)
+        
+        assert user['settings'] == {'notifications': False, 'language': 'en'}
+        assert 'settings.notifications' not in user
+        assert client.reads == 2
+    
+    asyncio.run(run())
+
+def test_callers_cannot_change_nested_cached_state():
+    async def run():
+        client = CountingClient()
+        cached = LastPerson07CachedDatabaseClient(client)
+        
+        (await cached.get_user(1))['settings']['language'] = 'de'
+        (await cached.get_user(1))['settings']['notifications'] = False
+        
+        assert (await cached.get_user(1))['settings'] == {'notifications': True, 'language': 'en'}
+    
+    asyncio.run(run())
@@ -0,0 +1,93 @@
+"""
+Tests for the write-behind counter aggregator
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('pymongo')
+
+from db.counter_aggregator import LastPerson07CounterAggregator
+
+def test_increments_are_merged_into_one_write_per_document(db_client):
+    async def run():
+        db_client.add_user(1, fetch_count=10)
+        counters = LastPerson07CounterAggregator(db_client)
+        
+        for _ in range(3):
+            counters.increment_user(1)
+            counters.increment_category('nature')
+        
+        assert counters.user_value(await db_client.get_user(1), 1) == 13
+        assert await counters.flush()
+        
+        assert db_client.users.docs[1]['fetch_count'] == 13
+        assert db_client.database['category_stats'].docs['nature']['fetches'] == 3
+        assert counters.get_stats()['operations'] == 2
+        assert counters.user_value(await db_client.get_user(1), 1) == 13
+        assert db_client.invalidated == [1]
+    
+    asyncio.run(run())
+
+def test_last_fetch_date_is_the_time_of_the_increment(db_client):
+    async def run():
+        db_client.add_user(1, fetch_count=0)
+        counters = LastPerson07CounterAggregator(db_client)
+        
+        counters.increment_user(1)
+        incremented_by = datetime.utcnow()
+        await asyncio.sleep(0.01)
+        await counters.flush()
+        
+        user = db_client.users.docs[1]
+        assert user['last_fetch_date'] <= incremented_by < user['counters_updated_at']
+    
+    asyncio.run(run())
+
+def test_deltas_stay_visible_while_the_write_is_in_flight(db_client):
+    async def run():
+        db_client.add_user(1, fetch_count=5)
+        counters = LastPerson07CounterAggregator(db_client)
+        users = db_client.users
+        users.gate = asyncio.Event()
+        
+        counters.increment_user(1, amount=2)
+        flush = asyncio.create_task(counters.flush())
+        await asyncio.sleep(0)
+        
+        # The write has not landed, so the stored document still lacks the delta
+        assert counters.pending == {}
+        assert counters.user_value(await db_client.get_user(1), 1) == 7
+        
+        counters.increment_user(1)
+        assert counters.user_value(await db_client.get_user(1), 1) == 8
+        
+        users.gate.set()
+        assert await flush
+        assert counters.user_value(await db_client.get_user(1), 1) == 8
+        assert counters.get_stats()['in_flight'] == 0
+    
+    asyncio.run(run())
+
+def test_failed_write_is_retried_without_losing_deltas(db_client):
+    async def run():
+        db_client.add_user(1, fetch_count=0)
+        counters = LastPerson07CounterAggregator(db_client)
+        
+        counters.increment_user(1)
+        db_client.users.error = RuntimeError('primary stepped down')
+        assert not await counters.flush()
+        assert counters.user_value(db_client.users.docs[1], 1) == 1
+        assert db_client.invalidated == []
+        
+        counters.increment_user(1)
+        db_client.users.error = None
+        assert await counters.flush()
+        
+        assert db_client.users.docs[1]['fetch_count'] == 2
+        assert counters.user_value(await db_client.get_user(1), 1) == 2
+        assert counters.get_stats()['failed_flushes'] == 1
+    
+    asyncio.run(run())
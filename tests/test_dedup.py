@@ -0,0 +1,49 @@
+"""
+Tests for the near-duplicate index
+"""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+from utils.dedup import LastPerson07DuplicateIndex
+from utils.metadata import LastPerson07ImageProcessor
+
+def _vertical_gradient(top, bottom, size=(320, 180)):
+    """Build a smooth top-to-bottom gradient between two RGB colours"""
+    weights = np.linspace(0.0, 1.0, size[1])[:, None, None]
+    rows = np.array(top) * (1 - weights) + np.array(bottom) * weights
+    return Image.fromarray(np.repeat(rows, size[0], axis=1).astype(np.uint8), 'RGB')
+
+def _noise(seed, size=(320, 180)):
+    """Build a textured image from random pixels"""
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8), 'RGB')
+
+def _check(index, image, key):
+    """Hash an image and run it through the index"""
+    return index.check_and_add(LastPerson07ImageProcessor().compute_dhash(image), key)
+
+def test_different_gradients_are_not_duplicates(tmp_path):
+    async def run():
+        index = LastPerson07DuplicateIndex(path=str(tmp_path / 'index.json'))
+        assert _check(index, _vertical_gradient((10, 20, 120), (0, 0, 0)), 'blue') is None
+        assert _check(index, _vertical_gradient((250, 120, 30), (255, 255, 255)), 'orange') is None
+        assert index.stats['duplicates'] == 0
+        assert index.stats['low_information'] == 2
+        assert len(index.entries) == 0
+    
+    asyncio.run(run())
+
+def test_textured_near_duplicate_is_found(tmp_path):
+    async def run():
+        index = LastPerson07DuplicateIndex(path=str(tmp_path / 'index.json'))
+        image = _noise(1)
+        assert _check(index, image, 'original') is None
+        assert _check(index, image.resize((640, 360)), 'resized') == 'original'
+        assert _check(index, _noise(2), 'other') is None
+    
+    asyncio.run(run())
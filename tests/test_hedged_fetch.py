@@ -0,0 +1,65 @@
+"""
+Tests for hedged provider requests
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('dotenv')
+pytest.importorskip('pydantic')
+
+from utils.fetcher import LastPerson07WallpaperFetcher
+
+PROVIDERS = [{'source_name': 'unsplash'}, {'source_name': 'pexels'}]
+
+def _fetcher(delays, results):
+    """Build a fetcher whose providers answer after the given delays"""
+    fetcher = LastPerson07WallpaperFetcher.__new__(LastPerson07WallpaperFetcher)
+    fetcher.started = []
+    fetcher.cancelled = []
+    
+    async def fetch_from_api(api_config, category):
+        name = api_config['source_name']
+        fetcher.started.append(name)
+        try:
+            await asyncio.sleep(delays[name])
+        except asyncio.CancelledError:
+            fetcher.cancelled.append(name)
+            raise
+        return results[name]
+    
+    fetcher._fetch_from_api = fetch_from_api
+    return fetcher
+
+def test_fast_primary_is_not_hedged():
+    async def run():
+        results = {'unsplash': {'source': 'unsplash'}, 'pexels': None}
+        fetcher = _fetcher({'unsplash': 0.01, 'pexels': 0.01}, results)
+        
+        assert await fetcher._fetch_hedged(PROVIDERS, 'nature', 0.2) == {'source': 'unsplash'}
+        assert fetcher.started == ['unsplash']
+    
+    asyncio.run(run())
+
+def test_slow_primary_is_hedged_and_cancelled():
+    async def run():
+        results = {'unsplash': {'source': 'unsplash'}, 'pexels': {'source': 'pexels'}}
+        fetcher = _fetcher({'unsplash': 1.0, 'pexels': 0.01}, results)
+        
+        assert await fetcher._fetch_hedged(PROVIDERS, 'nature', 0.05) == {'source': 'pexels'}
+        assert fetcher.started == ['unsplash', 'pexels']
+        assert fetcher.cancelled == ['unsplash']
+    
+    asyncio.run(run())
+
+def test_empty_primary_falls_through_without_waiting_for_the_delay():
+    async def run():
+        fetcher = _fetcher({'unsplash': 0, 'pexels': 0}, {'unsplash': None, 'pexels': {'source': 'pexels'}})
+        
+        started = asyncio.get_running_loop().time()
+        assert await fetcher._fetch_hedged(PROVIDERS, 'nature', 5.0) == {'source': 'pexels'}
+        assert asyncio.get_running_loop().time() - started < 1.0
+    
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+"""
+Tests for the buffered event log writer
+"""
+
+import asyncio
+
+from db.log_writer import LastPerson07LogWriter
+
+def _messages(db_client):
+    """Get the written log messages in insertion order"""
+    return [doc['message'] for doc in db_client.database['logs'].docs.values()]
+
+def test_events_are_written_in_batches(db_client):
+    async def run():
+        writer = LastPerson07LogWriter(db_client, batch_size=2)
+        for index in range(5):
+            assert writer.log_event('INFO', f"event {index}", user_id=1)
+        
+        while writer.queue:
+            assert await writer.flush()
+        
+        assert _messages(db_client) == [f"event {index}" for index in range(5)]
+        assert writer.get_stats()['batches'] == 3
+    
+    asyncio.run(run())
+
+def test_overflow_policies():
+    async def run():
+        oldest = LastPerson07LogWriter(None, max_queue=2)
+        newest = LastPerson07LogWriter(None, max_queue=2, overflow_policy='drop_newest')
+        
+        for index in range(3):
+            oldest.log_event('INFO', f"event {index}")
+            newest.log_event('INFO', f"event {index}")
+        
+        assert [entry['message'] for entry in oldest.queue] == ['event 1', 'event 2']
+        assert [entry['message'] for entry in newest.queue] == ['event 0', 'event 1']
+        assert oldest.stats['dropped'] == newest.stats['dropped'] == 1
+    
+    asyncio.run(run())
+
+def test_failed_batch_is_put_back_in_order(db_client):
+    async def run():
+        writer = LastPerson07LogWriter(db_client, batch_size=2)
+        for index in range(3):
+            writer.log_event('INFO', f"event {index}")
+        
+        db_client.database['logs'].error = RuntimeError('write concern timeout')
+        assert not await writer.flush()
+        assert [entry['message'] for entry in writer.queue] == ['event 0', 'event 1', 'event 2']
+        
+        db_client.database['logs'].error = None
+        await writer.stop()
+        assert _messages(db_client) == ['event 0', 'event 1', 'event 2']
+    
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+"""
+Tests for image quality scoring
+"""
+
+import io
+
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+from utils.metadata import LastPerson07ImageProcessor
+
+MIN_SCORE = 0.45
+
+def _encode(pixels):
+    """Encode RGB pixels as a JPEG"""
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, 'RGB').save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+def _vertical_gradient(top, bottom, size=(1920, 1080)):
+    """Build a smooth top-to-bottom gradient between two RGB colours"""
+    weights = np.linspace(0.0, 1.0, size[1])[:, None, None]
+    rows = np.array(top) * (1 - weights) + np.array(bottom) * weights
+    return np.repeat(rows, size[0], axis=1).astype(np.uint8)
+
+def _shapes(size=(1920, 1080)):
+    """Build a textured image of overlapping flat rectangles"""
+    rng = np.random.default_rng(1)
+    pixels = np.full((size[1], size[0], 3), 128, dtype=np.uint8)
+    for _ in range(40):
+        x, y = (int(v) for v in rng.integers(0, size))
+        w, h = (int(v) for v in rng.integers(50, 400, 2))
+        cv2.rectangle(pixels, (x, y), (x + w, y + h), tuple(int(c) for c in rng.integers(0, 256, 3)), -1)
+    return pixels
+
+def test_clean_gradient_is_not_blurry():
+    quality = LastPerson07ImageProcessor().score_quality_sync(_encode(_vertical_gradient((10, 20, 120), (0, 0, 0))))
+    assert quality['texture'] == 0
+    assert quality['score'] >= MIN_SCORE
+
+def test_blurred_photo_scores_below_sharp_one():
+    processor = LastPerson07ImageProcessor()
+    sharp = processor.score_quality_sync(_encode(_shapes()))
+    blurred = processor.score_quality_sync(_encode(cv2.GaussianBlur(_shapes(), (0, 0), 8)))
+    assert blurred['texture'] > 0.5
+    assert blurred['score'] < MIN_SCORE < sharp['score']
@@ -0,0 +1,132 @@
+"""
+Tests for the daily fetch quota engine
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('pymongo')
+
+from db.quota import LastPerson07QuotaEngine
+from db.queries import LastPerson07Queries
+
+def test_free_user_is_limited_atomically(db_client):
+    async def run():
+        db_client.add_user(1, tier='free')
+        quota = LastPerson07QuotaEngine(db_client, daily_limit=3)
+        
+        # Concurrent taps cannot overshoot the limit
+        results = await asyncio.gather(*(quota.acquire(1) for _ in range(6)))
+        
+        assert sorted(allowed for allowed, _, _ in results) == [False] * 3 + [True] * 3
+        assert sorted(remaining for allowed, remaining, _ in results if allowed) == [0, 1, 2]
+        assert await quota.today_count(1) == 3
+        assert quota.stats['granted'] == 3 and quota.stats['denied'] == 3
+    
+    asyncio.run(run())
+
+def test_unknown_user_gets_the_free_limit(db_client):
+    async def run():
+        quota = LastPerson07QuotaEngine(db_client, daily_limit=1)
+        
+        assert (await quota.acquire(42))[:2] == (True, 0)
+        assert (await quota.acquire(42))[:2] == (False, 0)
+    
+    asyncio.run(run())
+
+def test_premium_user_is_counted_past_the_free_limit(db_client):
+    async def run():
+        db_client.add_user(2, tier='premium')
+        quota = LastPerson07QuotaEngine(db_client, daily_limit=2)
+        
+        results = [await quota.acquire(2) for _ in range(4)]
+        
+        assert all(allowed and remaining == float('inf') for allowed, remaining, _ in results)
+        assert await quota.today_count(2) == 4
+    
+    asyncio.run(run())
+
+def test_banned_user_is_denied_and_not_counted(db_client):
+    async def run():
+        db_client.add_user(3, tier='free', banned=True)
+        quota = LastPerson07QuotaEngine(db_client, daily_limit=5)
+        
+        assert await quota.acquire(3) == (False, 0, None)
+        assert await quota.today_count(3) == 0
+    
+    asyncio.run(run())
+
+def test_database_errors_fail_open(db_client):
+    async def run():
+        db_client.add_user(4, tier='free')
+        quota = LastPerson07QuotaEngine(db_client, daily_limit=1)
+        db_client.database['usage_daily'].error = RuntimeError('connection reset')
+        
+        # Nothing was taken, so there is no day to refund
+        assert await quota.acquire(4) == (True, 0, None)
+        assert await quota.check(4) == (True, 0)
+        assert quota.stats['failed_open'] == 1
+    
+    asyncio.run(run())
+
+def test_check_does_not_use_up_a_fetch(db_client):
+    async def run():
+        db_client.add_user(5, tier='free')
+        queries = LastPerson07Queries(db_client, daily_limit=2)
+        
+        assert await queries.can_user_fetch_today(5) == (True, 2)
+        assert await queries.can_user_fetch_today(5) == (True, 2)
+        assert await queries.try_consume_fetch(5) == (True, 1)
+        assert await queries.try_consume_fetch(5) == (True, 0)
+        assert await queries.can_user_fetch_today(5) == (False, 0)
+        
+        stats = await queries.get_user_statistics(5)
+        assert (stats['today_fetches'], stats['remaining_fetches']) == (2, 0)
+    
+    asyncio.run(run())
+
+def test_refund_goes_back_to_the_day_the_fetch_was_taken(db_client):
+    async def run():
+        db_client.add_user(6, tier='free')
+        quota = LastPerson07QuotaEngine(db_client, daily_limit=5)
+        usage = db_client.database['usage_daily']
+        
+        # A fetch taken just before midnight and refunded just after it
+        usage.docs['6:2026-01-01'] = {'_id': '6:2026-01-01', 'user_id': 6, 'count': 3}
+        await quota.acquire(6)
+        await quota.refund(6, '2026-01-01')
+        
+        assert usage.docs['6:2026-01-01']['count'] == 2
+        assert await quota.today_count(6) == 1
+        
+        # Counts never go below zero
+        for _ in range(3):
+            await quota.refund(6, '2026-01-01')
+        assert usage.docs['6:2026-01-01']['count'] == 0
+        assert quota.stats['refunded'] == 3
+    
+    asyncio.run(run())
+
+def test_acquire_returns_the_day_it_counted_on(db_client):
+    async def run():
+        quota = LastPerson07QuotaEngine(db_client, daily_limit=1, retention_days=7)
+        allowed, _, day = await quota.acquire(7)
+        
+        usage = db_client.database['usage_daily'].docs[f"7:{day}"]
+        assert allowed and usage['day'] == day and usage['count'] == 1
+        assert (usage['expires_at'] - usage['last_fetch']).days < 7
+        
+        # Nothing is taken on a denial, so there is nothing to refund
+        assert await quota.acquire(7) == (False, 0, None)
+    
+    asyncio.run(run())
+
+def test_usage_documents_expire_through_a_ttl_index(db_client):
+    async def run():
+        quota = LastPerson07QuotaEngine(db_client)
+        
+        assert await quota.ensure_indexes()
+        assert db_client.database['usage_daily'].indexes == [('expires_at', {'expireAfterSeconds': 0})]
+    
+    asyncio.run(run())
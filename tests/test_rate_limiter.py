@@ -0,0 +1,58 @@
+"""
+Tests for the per-provider rate limiter
+"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('aiolimiter')
+
+from utils.rate_limiter import LastPerson07RateLimiter
+
+def test_pexels_monthly_quota_keeps_the_hourly_rate():
+    async def run():
+        limiter = LastPerson07RateLimiter('pexels', 200, 3600, reserve=2)
+        bucket = limiter.limiter
+        
+        limiter.update_from_headers({
+            'X-Ratelimit-Limit': '20000',
+            'X-Ratelimit-Remaining': '19999',
+            'X-Ratelimit-Reset': str(int(time.time()) + 20 * 24 * 3600)
+        })
+        
+        assert limiter.limiter is bucket
+        assert (limiter.limiter.max_rate, limiter.limiter.time_period) == (200, 3600)
+        assert limiter.get_status()['limit'] == 20000
+        assert limiter.has_capacity()
+    
+    asyncio.run(run())
+
+def test_exhausted_quota_pauses_until_reset():
+    async def run():
+        limiter = LastPerson07RateLimiter('pexels', 200, 3600, reserve=2)
+        limiter.update_from_headers({
+            'X-Ratelimit-Limit': '20000',
+            'X-Ratelimit-Remaining': '2',
+            'X-Ratelimit-Reset': str(int(time.time()) + 60)
+        })
+        assert not limiter.has_capacity()
+        
+        # Once the reported reset has passed, requests go out again at the configured rate
+        limiter.reset_at = time.time() - 1
+        assert limiter.has_capacity()
+        assert limiter.limiter.max_rate == 200
+    
+    asyncio.run(run())
+
+def test_429_pauses_for_retry_after():
+    async def run():
+        limiter = LastPerson07RateLimiter('pixabay', 100, 60)
+        limiter.update_from_headers({'Retry-After': '30'}, status=429)
+        
+        assert not limiter.has_capacity()
+        assert 25 <= limiter.get_status()['reset_in'] <= 30
+        assert limiter.throttled == 1
+    
+    asyncio.run(run())
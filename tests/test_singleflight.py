@@ -0,0 +1,69 @@
+"""
+Tests for single-flight coalescing
+"""
+
+import asyncio
+
+import pytest
+
+from utils.singleflight import LastPerson07SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    async def run():
+        flights = LastPerson07SingleFlight('test')
+        executions = []
+        
+        async def query():
+            executions.append(1)
+            await asyncio.sleep(0.01)
+            return 'batch'
+        
+        results = await asyncio.gather(*(flights.do('pexels:nature', query) for _ in range(5)))
+        
+        assert results == ['batch'] * 5
+        assert len(executions) == 1
+        assert flights.get_stats()['coalesced'] == 4
+        assert flights.in_flight() == 0
+        
+        # A finished call is forgotten, so the next caller runs a fresh one
+        await flights.do('pexels:nature', query)
+        assert len(executions) == 2
+    
+    asyncio.run(run())
+
+def test_failure_reaches_every_waiter():
+    async def run():
+        flights = LastPerson07SingleFlight('test')
+        
+        async def query():
+            await asyncio.sleep(0.01)
+            raise RuntimeError('provider down')
+        
+        results = await asyncio.gather(*(flights.do('key', query) for _ in range(3)), return_exceptions=True)
+        
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flights.in_flight() == 0
+    
+    asyncio.run(run())
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def run():
+        flights = LastPerson07SingleFlight('test')
+        release = asyncio.Event()
+        
+        async def query():
+            await release.wait()
+            return 'done'
+        
+        first = asyncio.create_task(flights.do('key', query))
+        second = asyncio.create_task(flights.do('key', query))
+        await asyncio.sleep(0)
+        
+        first.cancel()
+        release.set()
+        
+        assert await second == 'done'
+        with pytest.raises(asyncio.CancelledError):
+            await first
+    
+    asyncio.run(run())
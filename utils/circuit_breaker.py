@@ -0,0 +1,110 @@
+"""
+LastPerson07Bot Circuit Breaker Module
+Tracks wallpaper provider health and short-circuits failing providers
+"""
+
+import logging
+import time
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07CircuitBreaker:
+    """Closed/open/half-open circuit breaker with an EWMA health score"""
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        """Initialize the circuit breaker"""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        
+        # Circuit state
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        
+        # Health scoring (1.0 = every recent call succeeded)
+        self.health_score = 1.0
+        self.smoothing = 0.2
+        self.total_successes = 0
+        self.total_failures = 0
+        self.last_error: Optional[str] = None
+    
+    def is_available(self) -> bool:
+        """Check whether the provider may receive traffic, without claiming a probe"""
+        if self.state == self.CLOSED:
+            return True
+        
+        if self.state == self.OPEN:
+            return self._recovery_elapsed()
+        
+        return not self.probe_in_flight
+    
+    def allow_request(self) -> bool:
+        """Claim permission for a single request"""
+        if self.state == self.CLOSED:
+            return True
+        
+        if self.state == self.OPEN:
+            if not self._recovery_elapsed():
+                return False
+            
+            self.state = self.HALF_OPEN
+            logger.info(f"🟡 Circuit for {self.name} is half-open, probing provider")
+        
+        if self.probe_in_flight:
+            return False
+        
+        self.probe_in_flight = True
+        return True
+    
+    def record_success(self) -> None:
+        """Record a successful call"""
+        self.total_successes += 1
+        self.consecutive_failures = 0
+        self.health_score += self.smoothing * (1.0 - self.health_score)
+        
+        if self.state != self.CLOSED:
+            logger.info(f"🟢 Circuit for {self.name} closed again")
+        
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.probe_in_flight = False
+    
+    def record_failure(self, reason: str = '') -> None:
+        """Record a failed call (429, 5xx, timeout, connection error)"""
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.health_score -= self.smoothing * self.health_score
+        self.last_error = reason or None
+        self.probe_in_flight = False
+        
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"🔴 Circuit for {self.name} opened after {self.consecutive_failures} failures: {reason}")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def release(self) -> None:
+        """Release a claimed probe without an outcome (e.g. the request was cancelled)"""
+        self.probe_in_flight = False
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get current circuit state and health"""
+        return {
+            'state': self.state,
+            'health_score': round(self.health_score, 3),
+            'consecutive_failures': self.consecutive_failures,
+            'total_successes': self.total_successes,
+            'total_failures': self.total_failures,
+            'last_error': self.last_error
+        }
+    
+    def _recovery_elapsed(self) -> bool:
+        """Check whether an open circuit has waited long enough to probe"""
+        return self.opened_at is None or time.monotonic() - self.opened_at >= self.recovery_timeout
@@ -0,0 +1,234 @@
+"""
+LastPerson07Bot Color Index Module
+Searchable index of wallpaper palettes for colour and brightness filtered fetches
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from utils.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07ColorIndex:
+    """Quantized palettes of cached wallpapers held in NumPy arrays for vectorized nearest-colour queries"""
+    
+    INDEX_SAVE_DELAY = 5.0
+    PALETTE_SIZE = 5
+    
+    # Reference colours understood by /fetch
+    COLOR_NAMES = {
+        'red': (200, 30, 40),
+        'orange': (235, 130, 30),
+        'yellow': (240, 210, 50),
+        'green': (50, 150, 60),
+        'teal': (30, 140, 140),
+        'blue': (40, 90, 200),
+        'purple': (120, 60, 170),
+        'pink': (235, 120, 170),
+        'brown': (120, 80, 45),
+        'black': (15, 15, 15),
+        'white': (240, 240, 240),
+        'gray': (128, 128, 128),
+        'grey': (128, 128, 128)
+    }
+    
+    # Brightness words and the luma range (0-1) they accept
+    BRIGHTNESS_RANGES = {
+        'dark': (0.0, 0.35),
+        'light': (0.6, 1.01),
+        'bright': (0.6, 1.01)
+    }
+    
+    # Palette entries further than this (weighted RGB distance) from the asked colour do not match
+    MAX_COLOR_DISTANCE = 110.0
+    
+    # Green differences are the most visible, blue the least
+    CHANNEL_WEIGHTS = (2 / 3, 4 / 3, 1.0)
+    
+    def __init__(self, path: str = 'data/color_index.json', max_entries: int = 5000):
+        """Initialize the colour index"""
+        self.path = Path(path)
+        self.max_entries = max_entries
+        
+        # Key -> {'category', 'wallpaper_info', 'palette', 'weights', 'brightness'}, oldest first
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+        # Column arrays over entries, built on the first query after a change
+        self._keys: List[str] = []
+        self._categories = None
+        self._palettes = None
+        self._weights = None
+        self._brightness = None
+        self._dirty = True
+        
+        self._save_task: Optional[asyncio.Task] = None
+        
+        # Index statistics
+        self.stats = {
+            'queries': 0,
+            'matches': 0,
+            'misses': 0
+        }
+    
+    async def load(self) -> None:
+        """Load persisted palettes"""
+        if not self.path.exists():
+            logger.info(f"✅ Color index initialized at {self.path}")
+            return
+        
+        try:
+            data = json.loads(await asyncio.to_thread(self.path.read_text, encoding='utf-8'))
+        except Exception as e:
+            logger.error(f"❌ Error loading color index, starting empty: {e}")
+            return
+        
+        for key, entry in data.get('entries', []):
+            self.entries[key] = entry
+        self._dirty = True
+        
+        logger.info(f"✅ Color index loaded {len(self.entries)} palettes")
+    
+    async def close(self) -> None:
+        """Persist the index"""
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+        await self._save()
+    
+    @classmethod
+    def parse_filters(cls, words: List[str]) -> Tuple[List[str], Optional[str], Optional[str]]:
+        """Split /fetch arguments into the remaining words, a colour name and a brightness word"""
+        remaining, color, brightness = [], None, None
+        
+        for word in words:
+            lowered = word.lower()
+            if lowered in cls.COLOR_NAMES and color is None:
+                color = lowered
+            elif lowered in cls.BRIGHTNESS_RANGES and brightness is None:
+                brightness = lowered
+            else:
+                remaining.append(word)
+        
+        return remaining, color, brightness
+    
+    def add(self, key: str, category: str, wallpaper_info: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+        """Index a wallpaper from the palette in its extracted metadata"""
+        palette = metadata.get('palette')
+        if not key or not palette or 'brightness' not in metadata:
+            return
+        
+        # Pad short palettes (tiny or flat images) with zero-weight entries so every row has the same shape
+        weights = list(metadata.get('palette_weights', []))[:self.PALETTE_SIZE]
+        palette = list(palette)[:self.PALETTE_SIZE]
+        padding = self.PALETTE_SIZE - len(palette)
+        
+        self.entries.pop(key, None)
+        self.entries[key] = {
+            'category': category,
+            'wallpaper_info': wallpaper_info,
+            'palette': palette + [palette[0]] * padding,
+            'weights': weights + [0.0] * padding,
+            'brightness': metadata['brightness']
+        }
+        
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        
+        self._dirty = True
+        self._schedule_save()
+    
+    def query(
+        self,
+        color: Optional[str] = None,
+        brightness: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Get up to limit indexed wallpapers closest to a colour and within a brightness range, best first"""
+        self.stats['queries'] += 1
+        self._build_arrays()
+        
+        mask = np.ones(len(self._keys), dtype=bool)
+        if category:
+            mask &= self._categories == category
+        if brightness:
+            low, high = self.BRIGHTNESS_RANGES[brightness]
+            mask &= (self._brightness >= low) & (self._brightness < high)
+        
+        if color:
+            target = np.array(self.COLOR_NAMES[color], dtype=np.float32)
+            channel_weights = np.array(self.CHANNEL_WEIGHTS, dtype=np.float32)
+            distances = np.sqrt((((self._palettes - target) ** 2) * channel_weights).sum(axis=2))
+            
+            # A close colour only counts when it covers a fair share of the image
+            scores = (distances / np.sqrt(self._weights + 1e-3)).min(axis=1)
+            mask &= (np.where(self._weights > 0.1, distances, np.inf)).min(axis=1) <= self.MAX_COLOR_DISTANCE
+        elif brightness == 'dark':
+            scores = self._brightness
+        elif brightness:
+            scores = -self._brightness
+        else:
+            scores = np.zeros(len(self._keys), dtype=np.float32)
+        
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(scores[candidates], limit)[:limit]]
+        candidates = candidates[np.argsort(scores[candidates])]
+        
+        results = [self.entries[self._keys[index]] for index in candidates]
+        self.stats['matches' if results else 'misses'] += 1
+        return results
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and query statistics"""
+        return {
+            'size': len(self.entries),
+            **self.stats
+        }
+    
+    def _build_arrays(self) -> None:
+        """Rebuild the column arrays after entries changed"""
+        if not self._dirty:
+            return
+        
+        entries = list(self.entries.values())
+        self._keys = list(self.entries.keys())
+        self._categories = np.array([entry['category'] for entry in entries], dtype=object)
+        self._palettes = np.array([entry['palette'] for entry in entries], dtype=np.float32).reshape(-1, self.PALETTE_SIZE, 3)
+        self._weights = np.array([entry['weights'] for entry in entries], dtype=np.float32).reshape(-1, self.PALETTE_SIZE)
+        self._brightness = np.array([entry['brightness'] for entry in entries], dtype=np.float32)
+        self._dirty = False
+    
+    def _schedule_save(self) -> None:
+        """Persist the index shortly, coalescing bursts of inserts"""
+        if self._save_task and not self._save_task.done():
+            return
+        self._save_task = asyncio.create_task(self._delayed_save())
+    
+    async def _delayed_save(self) -> None:
+        """Wait for inserts to settle, then save the index"""
+        await asyncio.sleep(self.INDEX_SAVE_DELAY)
+        await self._save()
+    
+    async def _save(self) -> None:
+        """Write the index atomically"""
+        data = {'saved_at': time.time(), 'entries': list(self.entries.items())}
+        
+        def write() -> None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(data, default=str), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+        
+        try:
+            await asyncio.to_thread(write)
+        except Exception as e:
+            logger.error(f"❌ Error saving color index: {e}")
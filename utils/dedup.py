@@ -0,0 +1,188 @@
+"""
+LastPerson07Bot Dedup Module
+Persistent multi-index hash table of perceptual hashes for near-duplicate wallpaper suppression
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from itertools import combinations
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07DuplicateIndex:
+    """Multi-index hash table over 64-bit dHashes for Hamming-radius lookups, persisted under data/"""
+    
+    INDEX_SAVE_DELAY = 5.0
+    
+    # The hash is split into 16-bit chunks; any match within max_distance agrees closely on at least one chunk
+    CHUNKS = 4
+    CHUNK_BITS = 16
+    
+    # Gradients, solid colours and low-texture images hash to (almost) all zeros or all ones, so such
+    # hashes say nothing about the picture and would make every minimal wallpaper match the first one
+    MIN_HASH_BITS = 8
+    HASH_MASK = (1 << 64) - 1
+    
+    def __init__(self, path: str = 'data/dhash_index.json', max_distance: int = 6, max_entries: int = 50000):
+        """Initialize the duplicate index"""
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        
+        # Insertion-ordered (hash, key) pairs; the tables are rebuilt from these on load
+        self.entries: List[Tuple[int, str]] = []
+        
+        # One table per chunk: chunk value -> entries sharing it
+        self.tables: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in range(self.CHUNKS)]
+        
+        # Pigeonhole: with d differing bits over CHUNKS chunks, some chunk differs in at most d // CHUNKS bits
+        chunk_radius = max_distance // self.CHUNKS
+        self._probe_masks = [
+            sum(1 << bit for bit in bits)
+            for radius in range(chunk_radius + 1)
+            for bits in combinations(range(self.CHUNK_BITS), radius)
+        ]
+        
+        self._save_task: Optional[asyncio.Task] = None
+        
+        # Index statistics
+        self.stats = {
+            'lookups': 0,
+            'duplicates': 0,
+            'candidates_checked': 0,
+            'low_information': 0
+        }
+    
+    async def load(self) -> None:
+        """Load persisted hashes and rebuild the tables"""
+        if not self.path.exists():
+            logger.info(f"✅ Duplicate index initialized at {self.path}")
+            return
+        
+        try:
+            data = json.loads(await asyncio.to_thread(self.path.read_text, encoding='utf-8'))
+        except Exception as e:
+            logger.error(f"❌ Error loading duplicate index, starting empty: {e}")
+            return
+        
+        self._rebuild([(int(value, 16), key) for value, key in data.get('entries', [])])
+        logger.info(f"✅ Duplicate index loaded {len(self.entries)} hashes")
+    
+    async def close(self) -> None:
+        """Persist the index"""
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+        await self._save()
+    
+    def find(self, value: int) -> Optional[Tuple[str, int]]:
+        """Get the key and distance of the closest indexed hash within max_distance"""
+        self.stats['lookups'] += 1
+        best = None
+        seen = set()
+        
+        for index, table in enumerate(self.tables):
+            chunk = self._chunk(value, index)
+            
+            for mask in self._probe_masks:
+                for candidate in table.get(chunk ^ mask, ()):
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    
+                    distance = (candidate[0] ^ value).bit_count()
+                    if distance <= self.max_distance and (best is None or distance < best[1]):
+                        best = (candidate[1], distance)
+        
+        self.stats['candidates_checked'] += len(seen)
+        return best
+    
+    def add(self, value: int, key: str) -> None:
+        """Insert a hash"""
+        self.entries.append((value, key))
+        self._insert((value, key))
+        
+        if len(self.entries) > self.max_entries:
+            # Keep the newest half and rebuild rather than deleting from every table
+            self._rebuild(self.entries[-(self.max_entries // 2):])
+        
+        self._schedule_save()
+    
+    def is_informative(self, value: int) -> bool:
+        """Check that a hash has enough set and clear bits to identify an image"""
+        return min(value.bit_count(), (~value & self.HASH_MASK).bit_count()) >= self.MIN_HASH_BITS
+    
+    def check_and_add(self, value: int, key: str) -> Optional[str]:
+        """Get the key of a near-duplicate stored under a different key, otherwise index this hash"""
+        # Low-information hashes are neither matched nor indexed
+        if not self.is_informative(value):
+            self.stats['low_information'] += 1
+            return None
+        
+        match = self.find(value)
+        
+        if match and match[0] != key:
+            self.stats['duplicates'] += 1
+            logger.debug(f"🪞 {key} is a near-duplicate of {match[0]} (distance {match[1]})")
+            return match[0]
+        
+        if not match:
+            self.add(value, key)
+        return None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and lookup statistics"""
+        lookups = self.stats['lookups']
+        
+        return {
+            'size': len(self.entries),
+            'max_distance': self.max_distance,
+            'avg_candidates': self.stats['candidates_checked'] / lookups if lookups else 0.0,
+            **self.stats
+        }
+    
+    def _chunk(self, value: int, index: int) -> int:
+        """Get one CHUNK_BITS-wide slice of a hash"""
+        return (value >> (index * self.CHUNK_BITS)) & ((1 << self.CHUNK_BITS) - 1)
+    
+    def _insert(self, entry: Tuple[int, str]) -> None:
+        """Add an entry to every chunk table"""
+        for index, table in enumerate(self.tables):
+            table.setdefault(self._chunk(entry[0], index), []).append(entry)
+    
+    def _rebuild(self, entries: List[Tuple[int, str]]) -> None:
+        """Rebuild the tables from a list of entries"""
+        self.entries = list(entries)
+        self.tables = [{} for _ in range(self.CHUNKS)]
+        for entry in self.entries:
+            self._insert(entry)
+    
+    def _schedule_save(self) -> None:
+        """Persist the index shortly, coalescing bursts of inserts"""
+        if self._save_task and not self._save_task.done():
+            return
+        self._save_task = asyncio.create_task(self._delayed_save())
+    
+    async def _delayed_save(self) -> None:
+        """Wait for inserts to settle, then save the index"""
+        await asyncio.sleep(self.INDEX_SAVE_DELAY)
+        await self._save()
+    
+    async def _save(self) -> None:
+        """Write the index atomically"""
+        data = {'saved_at': time.time(), 'entries': [(f"{value:016x}", key) for value, key in self.entries]}
+        
+        def write() -> None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+        
+        try:
+            await asyncio.to_thread(write)
+        except Exception as e:
+            logger.error(f"❌ Error saving duplicate index: {e}")
@@ -0,0 +1,283 @@
+"""
+LastPerson07Bot Disk Cache Module
+Content-addressed on-disk image cache with byte-budget LRU eviction
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07DiskCache:
+    """Image cache under data/ keyed by source URL and stored by SHA-256 content hash"""
+    
+    INDEX_FILE = 'index.json'
+    INDEX_SAVE_DELAY = 5.0
+    
+    def __init__(self, root: str = 'data/images', max_bytes: int = 512 * 1024 * 1024):
+        """Initialize the disk cache"""
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        
+        # Source key -> content hash, and content hash -> source keys for eviction
+        self.keys: Dict[str, str] = {}
+        self.hash_keys: Dict[str, Set[str]] = {}
+        
+        # Content hash -> blob entry, least recently used first
+        self.blobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        
+        self._save_task: Optional[asyncio.Task] = None
+        
+        # Content hash -> blob write in progress, shared by concurrent puts of the same image
+        self._writes: Dict[str, asyncio.Task] = {}
+        
+        # Cache statistics
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0
+        }
+    
+    async def load(self) -> None:
+        """Load the sidecar index, dropping entries whose blobs are gone"""
+        await asyncio.to_thread(self.root.mkdir, parents=True, exist_ok=True)
+        
+        index_path = self.root / self.INDEX_FILE
+        if not index_path.exists():
+            logger.info(f"✅ Disk cache initialized at {self.root}")
+            return
+        
+        try:
+            index = json.loads(await asyncio.to_thread(index_path.read_text, encoding='utf-8'))
+        except Exception as e:
+            logger.error(f"❌ Error loading disk cache index, starting empty: {e}")
+            return
+        
+        blobs = sorted(index.get('blobs', {}).items(), key=lambda item: item[1].get('last_access', 0))
+        for content_hash, entry in blobs:
+            if self._blob_path(content_hash).exists():
+                self.blobs[content_hash] = entry
+                self.total_bytes += entry['size']
+        
+        for key, content_hash in index.get('keys', {}).items():
+            if content_hash in self.blobs:
+                self._map_key(key, content_hash)
+        
+        logger.info(f"✅ Disk cache loaded {len(self.blobs)} images ({self.total_bytes / (1024 * 1024):.1f}MB)")
+    
+    async def close(self) -> None:
+        """Persist the index"""
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+        await self._save_index()
+    
+    def contains(self, key: str) -> bool:
+        """Check if a source key is cached"""
+        return key in self.keys
+    
+    def read(self, key: str) -> Optional[memoryview]:
+        """Map a cached image into memory without copying it"""
+        content_hash = self.keys.get(key)
+        if not content_hash:
+            self.stats['misses'] += 1
+            return None
+        
+        try:
+            with open(self._blob_path(content_hash), 'rb') as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Disk cache blob unreadable, dropping it: {e}")
+            self._drop_blob(content_hash)
+            self.stats['misses'] += 1
+            return None
+        
+        self._touch(content_hash)
+        self.stats['hits'] += 1
+        return memoryview(mapped)
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        """Read a cached image as a bytes copy, for callers such as uploads that need bytes; read() avoids the copy"""
+        view = self.read(key)
+        if view is None:
+            return None
+        
+        try:
+            # Page the mapping in off the event loop
+            return await asyncio.to_thread(view.tobytes)
+        finally:
+            view.release()
+    
+    async def put(self, key: str, data: bytes, meta: Optional[Dict[str, Any]] = None) -> str:
+        """Store an image under its content hash and map the source key to it"""
+        content_hash = hashlib.sha256(data).hexdigest()
+        
+        if content_hash not in self.blobs:
+            # Concurrent puts of the same image wait for one write instead of accounting it twice
+            write = self._writes.get(content_hash)
+            if not write:
+                write = asyncio.create_task(self._store_blob(content_hash, data))
+                self._writes[content_hash] = write
+                write.add_done_callback(lambda _: self._writes.pop(content_hash, None))
+            await write
+        
+        # The blob may have been evicted while this put waited for the write
+        if content_hash not in self.blobs:
+            return content_hash
+        
+        if meta:
+            self.blobs[content_hash].setdefault('meta', {}).update(meta)
+        
+        self._map_key(key, content_hash)
+        self._touch(content_hash)
+        
+        await self._evict()
+        self._schedule_save()
+        return content_hash
+    
+    def get_meta(self, key: str) -> Dict[str, Any]:
+        """Get metadata stored alongside a cached image"""
+        content_hash = self.keys.get(key)
+        if not content_hash:
+            return {}
+        return self.blobs[content_hash].get('meta', {})
+    
+    def update_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        """Merge metadata into a cached image's index entry"""
+        content_hash = self.keys.get(key)
+        if not content_hash:
+            return
+        
+        self.blobs[content_hash].setdefault('meta', {}).update(meta)
+        self._schedule_save()
+    
+    def keys_missing_meta(self, field: str, limit: int) -> List[str]:
+        """Get up to limit keys whose images lack a metadata field, most recently used first"""
+        missing = []
+        
+        for content_hash in reversed(self.blobs):
+            if len(missing) >= limit:
+                break
+            keys = self.hash_keys.get(content_hash)
+            if field not in self.blobs[content_hash].get('meta', {}) and keys:
+                missing.append(next(iter(keys)))
+        
+        return missing
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit statistics"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        
+        return {
+            'images': len(self.blobs),
+            'keys': len(self.keys),
+            'used_mb': self.total_bytes / (1024 * 1024),
+            'budget_mb': self.max_bytes / (1024 * 1024),
+            'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0,
+            **self.stats
+        }
+    
+    def _blob_path(self, content_hash: str) -> Path:
+        """Get the on-disk path of a blob"""
+        return self.root / content_hash[:2] / content_hash
+    
+    async def _store_blob(self, content_hash: str, data: bytes) -> None:
+        """Write a blob and account for it once"""
+        await asyncio.to_thread(self._write_blob, content_hash, data)
+        
+        self.blobs[content_hash] = {'size': len(data), 'last_access': time.time(), 'meta': {}}
+        self.total_bytes += len(data)
+        self.stats['writes'] += 1
+    
+    def _write_blob(self, content_hash: str, data: bytes) -> None:
+        """Write a blob atomically"""
+        path = self._blob_path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    
+    def _map_key(self, key: str, content_hash: str) -> None:
+        """Point a source key at a blob, unlinking it from the blob it pointed at before"""
+        previous = self.keys.get(key)
+        if previous and previous != content_hash:
+            self.hash_keys.get(previous, set()).discard(key)
+        
+        self.keys[key] = content_hash
+        self.hash_keys.setdefault(content_hash, set()).add(key)
+    
+    def _touch(self, content_hash: str) -> None:
+        """Mark a blob as most recently used"""
+        entry = self.blobs.get(content_hash)
+        if entry:
+            entry['last_access'] = time.time()
+            self.blobs.move_to_end(content_hash)
+    
+    def _drop_blob(self, content_hash: str) -> Optional[Path]:
+        """Remove a blob from the index and return its path"""
+        entry = self.blobs.pop(content_hash, None)
+        if not entry:
+            return None
+        
+        self.total_bytes -= entry['size']
+        for key in self.hash_keys.pop(content_hash, ()):
+            self.keys.pop(key, None)
+        return self._blob_path(content_hash)
+    
+    async def _evict(self) -> None:
+        """Evict least recently used blobs until the cache fits its byte budget"""
+        paths = []
+        while self.total_bytes > self.max_bytes and len(self.blobs) > 1:
+            content_hash = next(iter(self.blobs))
+            paths.append(self._drop_blob(content_hash))
+            self.stats['evictions'] += 1
+        
+        if paths:
+            await asyncio.to_thread(self._unlink_all, paths)
+            logger.debug(f"Evicted {len(paths)} images from disk cache")
+    
+    @staticmethod
+    def _unlink_all(paths) -> None:
+        """Delete evicted blob files"""
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _schedule_save(self) -> None:
+        """Persist the index shortly, coalescing bursts of writes"""
+        if self._save_task and not self._save_task.done():
+            return
+        self._save_task = asyncio.create_task(self._delayed_save())
+    
+    async def _delayed_save(self) -> None:
+        """Wait for writes to settle, then save the index"""
+        await asyncio.sleep(self.INDEX_SAVE_DELAY)
+        await self._save_index()
+    
+    async def _save_index(self) -> None:
+        """Write the sidecar index atomically"""
+        index = {'keys': dict(self.keys), 'blobs': dict(self.blobs)}
+        
+        def write() -> None:
+            index_path = self.root / self.INDEX_FILE
+            tmp_path = index_path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(index), encoding='utf-8')
+            os.replace(tmp_path, index_path)
+        
+        try:
+            await asyncio.to_thread(write)
+        except Exception as e:
+            logger.error(f"❌ Error saving disk cache index: {e}")
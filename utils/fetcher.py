@@ -5,25 +5,41 @@ Handles fetching wallpapers from various sources
 
 import asyncio
 import logging
+import math
 import random
-from typing import Optional, Dict, Any, List
+from collections import deque
+from typing import Optional, Dict, Any, List, Deque, Callable, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 import aiohttp
-import requests
-from PIL import Image
-import io
 
 from config.config import LastPerson07Config
+from db.models import WallpaperInfo
+from utils.circuit_breaker import LastPerson07CircuitBreaker
+from utils.disk_cache import LastPerson07DiskCache
+from utils.http_client import LastPerson07HttpClient
+from utils.rate_limiter import LastPerson07RateLimiter
+from utils.singleflight import LastPerson07SingleFlight
 
 logger = logging.getLogger(__name__)
 
 class LastPerson07WallpaperFetcher:
     """Wallpaper fetcher with fallback chain support"""
     
-    def __init__(self, db_client, config: LastPerson07Config):
+    def __init__(
+        self,
+        db_client,
+        config: LastPerson07Config,
+        disk_cache: Optional[LastPerson07DiskCache] = None,
+        http_client: Optional[LastPerson07HttpClient] = None
+    ):
         """Initialize the wallpaper fetcher"""
         self.db_client = db_client
         self.config = config
+        self.disk_cache = disk_cache
+        self.http_client = http_client
+        self._owns_http_client = False
+        self.quality_scorer = None  # Injected by the bot once cached images are being scored
         self.session: Optional[aiohttp.ClientSession] = None
         
         # API configurations
@@ -32,19 +48,24 @@ class LastPerson07WallpaperFetcher:
                 'base_url': 'https://api.unsplash.com',
                 'endpoint': '/photos/random',
                 'headers': lambda key: {'Authorization': f'Client-ID {key}'} if key else {},
+                'rate_limit': (50, 3600),  # Demo applications get 50 requests per hour
                 'params': {
                     'orientation': 'landscape',
                     'content_filter': 'high',
+                    'count': min(config.PROVIDER_BATCH_SIZE, 30),  # Unsplash caps random batches at 30
                     'w': 1920,
                     'h': 1080
                 }
             },
             'pexels': {
                 'base_url': 'https://api.pexels.com/v1',
-                'endpoint': '/curated',
+                'endpoint': '/search',
                 'headers': lambda key: {'Authorization': key} if key else {},
+                'rate_limit': (200, 3600),
+                'total_field': 'total_results',
+                'max_pages': 10,
                 'params': {
-                    'per_page': 1,
+                    'per_page': min(config.PROVIDER_BATCH_SIZE, 80),
                     'orientation': 'landscape'
                 }
             },
@@ -52,9 +73,11 @@ class LastPerson07WallpaperFetcher:
                 'base_url': 'https://pixabay.com/api',
                 'endpoint': '/',
                 'headers': lambda key: {},
+                'rate_limit': (100, 60),
+                'total_field': 'totalHits',
+                'max_pages': 3,
                 'params': {
-                    'key': key if key else 'demo-key',
-                    'per_page': 1,
+                    'per_page': min(max(config.PROVIDER_BATCH_SIZE, 3), 200),
                     'image_type': 'photo',
                     'orientation': 'horizontal',
                     'min_width': 1920,
@@ -65,28 +88,103 @@ class LastPerson07WallpaperFetcher:
             }
         }
     
+        # Delivery size negotiated with the providers (smallest image that still passes validation)
+        self.target_width = config.WALLPAPER_TARGET_WIDTH
+        self.target_height = config.WALLPAPER_TARGET_HEIGHT
+        self.jpeg_quality = config.WALLPAPER_JPEG_QUALITY
+        
+        # Batched candidates waiting to be served, per category
+        self.candidate_queues: Dict[str, Deque[WallpaperInfo]] = {}
+        self.candidate_queue_limit = config.PROVIDER_BATCH_SIZE * 3
+        
+        # Result pages each (provider, category) query is known to have, from the totals of earlier responses
+        self.page_counts: Dict[Tuple[str, str], int] = {}
+        
+        # Identical in-flight provider queries and downloads share a single call
+        self.query_flights = LastPerson07SingleFlight('provider_queries')
+        self.download_flights = LastPerson07SingleFlight('downloads')
+        
+        # Streaming download limits and counters
+        self.max_download_bytes = config.MAX_DOWNLOAD_MB * 1024 * 1024
+        self.download_chunk_size = 64 * 1024
+        self.active_downloads: Dict[str, Dict[str, Optional[int]]] = {}
+        self.download_stats = {
+            'downloads': 0,
+            'bytes_transferred': 0,
+            'aborted_oversize': 0,
+            'rejected_header': 0,
+            'skipped_low_quality': 0
+        }
+        
+        # Static provider list and per-provider circuit breakers
+        self.provider_configs = self._build_provider_configs()
+        self.breakers: Dict[str, LastPerson07CircuitBreaker] = {
+            api_config['source_name']: LastPerson07CircuitBreaker(
+                api_config['source_name'],
+                failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=config.CIRCUIT_RECOVERY_SECONDS
+            )
+            for api_config in self.provider_configs
+            if api_config['source_name'] != 'demo'
+        }
+        
+        # Per-provider token buckets, adjusted from the quota headers of each response
+        self.rate_limiters = {
+            name: LastPerson07RateLimiter(
+                name,
+                *self.apis[name]['rate_limit'],
+                reserve=config.RATE_LIMIT_RESERVE
+            )
+            for name in self.breakers
+        }
+    
     async def initialize(self) -> None:
-        """Initialize HTTP session"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={'User-Agent': 'LastPerson07Bot/2.0.0'}
-        )
+        """Attach to the shared HTTP client, creating a private one if none was injected"""
+        if not self.http_client:
+            self.http_client = LastPerson07HttpClient(self.config)
+            self._owns_http_client = True
+        
+        self.session = await self.http_client.start()
         logger.info("✅ Wallpaper fetcher initialized")
     
     async def close(self) -> None:
-        """Close HTTP session"""
-        if self.session:
-            await self.session.close()
-            logger.info("✅ Wallpaper fetcher closed")
+        """Cancel shared in-flight calls and close the HTTP client if this fetcher created it"""
+        await self.query_flights.cancel_all()
+        await self.download_flights.cancel_all()
+        
+        if self.http_client and self._owns_http_client:
+            await self.http_client.close()
+        
+        self.session = None
+        logger.info("✅ Wallpaper fetcher closed")
     
-    async def fetch_wallpaper(self, category: str = 'nature') -> Optional[Dict[str, Any]]:
+    def get_warmup_urls(self) -> List[str]:
+        """Get the provider endpoints worth pre-connecting to at startup"""
+        return [api_config['url'] for api_config in self.provider_configs]
+    
+    async def fetch_wallpaper(self, category: str = 'nature', premium: bool = False) -> Optional[Dict[str, Any]]:
         """Fetch wallpaper information with fallback chain"""
         if not self.session:
             await self.initialize()
         
+        # Serve from previously fetched batches before spending another API call
+        candidate = self._pop_candidate(category)
+        if candidate:
+            logger.debug(f"📦 Serving batched {category} candidate from {candidate['source']}")
+            return candidate
+        
         # Get active APIs in priority order
         active_apis = await self._get_active_apis()
         
+        # Race providers when hedging is enabled and there is something to hedge with
+        if self.config.HEDGED_FETCH_ENABLED and len(active_apis) > 1:
+            hedge_delay = 0 if premium else self.config.HEDGE_DELAY_SECONDS
+            wallpaper_info = await self._fetch_hedged(active_apis, category, hedge_delay)
+            
+            if not wallpaper_info:
+                logger.error("❌ All APIs failed to fetch wallpaper")
+            return wallpaper_info
+        
         for api_config in active_apis:
             try:
                 logger.info(f"🔄 Trying API: {api_config['source_name']}")
@@ -104,8 +202,51 @@ class LastPerson07WallpaperFetcher:
         logger.error("❌ All APIs failed to fetch wallpaper")
         return None
     
-    async def _get_active_apis(self) -> List[Dict[str, Any]]:
-        """Get list of active API configurations sorted by priority"""
+    async def _fetch_hedged(self, active_apis: List[Dict[str, Any]], category: str, hedge_delay: float) -> Optional[Dict[str, Any]]:
+        """Start providers in priority order, hedging after a delay; first valid result wins"""
+        waiting = list(active_apis)
+        pending = set()
+        sources = {}
+        
+        try:
+            while waiting or pending:
+                # Launch the next provider in line
+                if waiting:
+                    api_config = waiting.pop(0)
+                    logger.info(f"🔄 Trying API: {api_config['source_name']}")
+                    
+                    task = asyncio.create_task(self._fetch_from_api(api_config, category))
+                    sources[task] = api_config['source_name']
+                    pending.add(task)
+                
+                # Wait for a result, or until it is time to hedge with the next provider
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if waiting else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                for task in done:
+                    if task.exception():
+                        logger.warning(f"⚠️ Failed to fetch from {sources[task]}: {task.exception()}")
+                        continue
+                    
+                    wallpaper_info = task.result()
+                    if wallpaper_info:
+                        logger.info(f"✅ Successfully fetched wallpaper from {sources[task]} (hedged)")
+                        return wallpaper_info
+            
+            return None
+            
+        finally:
+            # Cancel the losers
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    def _build_provider_configs(self) -> List[Dict[str, Any]]:
+        """Build the provider list from configured API keys, sorted by priority"""
         active_apis = []
         
         # Add APIs with keys
@@ -148,6 +289,51 @@ class LastPerson07WallpaperFetcher:
         active_apis.sort(key=lambda x: x['priority'])
         return active_apis
     
+    async def _get_active_apis(self) -> List[Dict[str, Any]]:
+        """Get providers whose circuit and quota allow traffic, healthy ones first"""
+        active_apis = [
+            api_config for api_config in self.provider_configs
+            if api_config['source_name'] not in self.breakers
+            or (self.breakers[api_config['source_name']].is_available()
+                and self.rate_limiters[api_config['source_name']].has_capacity())
+        ]
+        
+        # Demote degraded providers behind healthy ones, keeping priority order within each group
+        active_apis.sort(key=lambda x: (self._is_degraded(x['source_name']), x['priority']))
+        return active_apis
+    
+    def _is_degraded(self, source_name: str) -> bool:
+        """Check if a provider's health score fell below the healthy threshold"""
+        breaker = self.breakers.get(source_name)
+        return bool(breaker and breaker.health_score < 0.5)
+    
+    def _record_outcome(self, source_name: str, success: bool, reason: str = '') -> None:
+        """Record a request outcome on the provider's circuit breaker"""
+        breaker = self.breakers.get(source_name)
+        if not breaker:
+            return
+        
+        if success:
+            breaker.record_success()
+        else:
+            breaker.record_failure(reason)
+    
+    def _record_response(self, source_name: str, status: int) -> None:
+        """Record an HTTP response; only 429 and 5xx count against the provider"""
+        if status == 200:
+            self._record_outcome(source_name, True)
+        elif status == 429 or status >= 500:
+            self._record_outcome(source_name, False, f"HTTP {status}")
+        elif source_name in self.breakers:
+            self.breakers[source_name].release()
+    
+    def get_provider_health(self) -> Dict[str, Dict[str, Any]]:
+        """Get circuit state, health score and remaining quota for every provider"""
+        return {
+            name: {**breaker.get_status(), 'quota': self.rate_limiters[name].get_status()}
+            for name, breaker in self.breakers.items()
+        }
+    
     async def _fetch_from_api(self, api_config: Dict[str, Any], category: str) -> Optional[Dict[str, Any]]:
         """Fetch wallpaper from a specific API"""
         source_name = api_config['source_name']
@@ -164,10 +350,34 @@ class LastPerson07WallpaperFetcher:
                 'download_url': f"https://picsum.photos/1920/1080?random={random.randint(1, 1000)}"
             }
         
+        # Concurrent requests for the same provider and category share one API call,
+        # then each caller takes its own wallpaper from the queued batch
+        await self.query_flights.do(
+            f"{source_name}:{category}",
+            lambda: self._query_provider(api_config, category)
+        )
+        return self._pop_candidate(category)
+    
+    async def _query_provider(self, api_config: Dict[str, Any], category: str) -> int:
+        """Query a provider for a batch of wallpapers and queue them; returns the number queued"""
+        source_name = api_config['source_name']
+        
         api_info = self.apis.get(source_name)
         if not api_info:
             logger.error(f"Unknown source: {source_name}")
-            return None
+            return 0
+        
+        # Route away from providers that are about to run out of quota
+        rate_limiter = self.rate_limiters.get(source_name)
+        if rate_limiter and not rate_limiter.has_capacity():
+            logger.debug(f"Skipping {source_name}: rate limit quota exhausted")
+            return 0
+        
+        # Skip providers whose circuit is open
+        breaker = self.breakers.get(source_name)
+        if breaker and not breaker.allow_request():
+            logger.debug(f"Skipping {source_name}: circuit is {breaker.state}")
+            return 0
         
         # Build URL and parameters
         url = api_config['url']
@@ -180,128 +390,425 @@ class LastPerson07WallpaperFetcher:
         elif source_name == 'pexels':
             params['query'] = category
         elif source_name == 'pixabay':
+            params['key'] = api_config.get('api_key', '')
             params['category'] = category if category in ['nature', 'animals', 'people'] else ''
         
+        # Paged providers start on page 1 and only pick later pages an earlier total showed to exist
+        page = 1
+        if 'total_field' in api_info:
+            page = random.randint(1, self.page_counts.get((source_name, category), 1))
+            params['page'] = page
+        
         try:
             # Make request
-            if self.session:
-                async with self.session.get(url, headers=headers, params=params) as response:
-                    if response.status != 200:
-                        logger.error(f"API request failed: {response.status}")
-                        return None
-                    
-                    data = await response.json()
-            else:
-                # Fallback to requests
-                import requests
-                response = requests.get(url, headers=headers, params=params)
-                if response.status_code != 200:
+            if not self.session:
+                await self.initialize()
+            
+            if rate_limiter:
+                await rate_limiter.acquire()
+            
+            async with self.session.get(url, headers=headers, params=params) as response:
+                if rate_limiter:
+                    rate_limiter.update_from_headers(response.headers, response.status)
+                
+                # Pixabay rejects a page past its results with 400 rather than returning an empty page
+                past_last_page = response.status == 400 and page > 1
+                if response.status != 200 and not past_last_page:
+                    self._record_response(source_name, response.status)
                     logger.error(f"API request failed: {response.status}")
-                    return None
-                data = response.json()
+                    return 0
+                
+                data = None if past_last_page else await response.json()
+            
+            if isinstance(data, list):
+                results = data
+            else:
+                results = (data or {}).get('photos') or (data or {}).get('hits') or []
+            
+            # An empty later page means the results shrank since the total was seen, not that the provider failed
+            if page > 1 and not results:
+                return await self._retry_first_page(api_config, category, breaker)
+            
+            if isinstance(data, dict) and 'total_field' in api_info:
+                total = data.get(api_info['total_field']) or 0
+                pages = -(-total // params['per_page'])
+                self.page_counts[(source_name, category)] = max(1, min(pages, api_info['max_pages']))
             
             # Parse response based on API
+            candidates = []
             if source_name == 'unsplash':
-                return await self._parse_unsplash_response(data)
+                candidates = await self._parse_unsplash_response(data)
             elif source_name == 'pexels':
-                return await self._parse_pexels_response(data)
+                candidates = await self._parse_pexels_response(data)
             elif source_name == 'pixabay':
-                return await self._parse_pixabay_response(data)
+                candidates = await self._parse_pixabay_response(data)
+            
+            # A batch with results but no usable rendition spent quota for nothing; count it against the circuit
+            if not candidates:
+                if results:
+                    reason = f"none of {len(results)} results usable"
+                    if source_name == 'pixabay':
+                        reason += " (fullHDURL/imageURL need full API access)"
+                    logger.warning(f"⚠️ {source_name.title()} returned {reason}")
+                    self._record_outcome(source_name, False, reason)
+                elif breaker:
+                    breaker.release()
+                return 0
+            
+            self._record_outcome(source_name, True)
+            return self._enqueue_candidates(category, candidates)
             
+        except asyncio.CancelledError:
+            # Shutdown cancelled the request; give back any half-open probe
+            if breaker:
+                breaker.release()
+            raise
         except Exception as e:
             logger.error(f"Error fetching from {source_name}: {e}")
-            return None
+            self._record_outcome(source_name, False, str(e) or type(e).__name__)
+            return 0
+    
+    async def _retry_first_page(
+        self,
+        api_config: Dict[str, Any],
+        category: str,
+        breaker: Optional[LastPerson07CircuitBreaker]
+    ) -> int:
+        """Forget a query's page count and ask for its first page instead"""
+        self.page_counts.pop((api_config['source_name'], category), None)
+        if breaker:
+            breaker.release()
+        return await self._query_provider(api_config, category)
+    
+    def _enqueue_candidates(self, category: str, candidates: List[Dict[str, Any]]) -> int:
+        """Validate a parsed batch and queue it; returns the number of candidates queued"""
+        queue = self.candidate_queues.setdefault(category, deque())
+        queued = 0
+        
+        for candidate in candidates:
+            if len(queue) >= self.candidate_queue_limit:
+                break
+            
+            try:
+                wallpaper = WallpaperInfo(**candidate, category=category)
+            except Exception as e:
+                logger.debug(f"Skipping invalid candidate from {candidate.get('source')}: {e}")
+                continue
+            
+            queue.append(wallpaper)
+            queued += 1
+        
+        if queued:
+            logger.debug(f"📦 Queued {queued} {category} candidates ({len(queue)} waiting)")
+        return queued
+    
+    def _pop_candidate(self, category: str) -> Optional[Dict[str, Any]]:
+        """Pop a queued candidate for a category"""
+        queue = self.candidate_queues.get(category)
+        
+        while queue:
+            candidate = queue.popleft()
+            
+            # Skip images the quality scorer already rated blurry before paying for another download
+            if self.quality_scorer and self.quality_scorer.is_low_quality(candidate.url):
+                self.download_stats['skipped_low_quality'] += 1
+                continue
+            
+            return candidate.model_dump()
         
         return None
     
-    async def _parse_unsplash_response(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Parse Unsplash API response"""
-        try:
-            return {
-                'url': data['urls']['regular'],
-                'source': 'unsplash',
-                'width': data['width'],
-                'height': data['height'],
-                'description': data.get('description') or data.get('alt_description'),
-                'photographer': data['user']['name'],
-                'photographer_url': data['user']['links']['html'],
-                'download_url': data['links']['download_location']
-            }
-        except Exception as e:
-            logger.error(f"Error parsing Unsplash response: {e}")
-            return None
+    def get_candidate_counts(self) -> Dict[str, int]:
+        """Get the number of queued candidates per category"""
+        return {category: len(queue) for category, queue in self.candidate_queues.items()}
     
-    async def _parse_pexels_response(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def _parse_unsplash_response(self, data: Any) -> List[Dict[str, Any]]:
+        """Parse Unsplash API response (a list of photos when count is set)"""
+        photos = data if isinstance(data, list) else [data]
+        candidates = []
+        
+        for photo in photos:
+            try:
+                size = self._negotiate_size(photo['width'], photo['height'])
+                if not size:
+                    continue
+                
+                # Let imgix resize and re-encode the raw image to the delivery size
+                url = self._with_params(
+                    photo['urls']['raw'],
+                    w=size[0], fm='jpg', q=self.jpeg_quality, fit='max', cs='tinysrgb'
+                )
+                
+                candidates.append({
+                    'photo_id': str(photo['id']),
+                    'url': url,
+                    'source': 'unsplash',
+                    'width': size[0],
+                    'height': size[1],
+                    'description': photo.get('description') or photo.get('alt_description'),
+                    'photographer': photo['user']['name'],
+                    'photographer_url': photo['user']['links']['html'],
+                    'download_url': photo['links']['download_location']
+                })
+            except Exception as e:
+                logger.error(f"Error parsing Unsplash response: {e}")
+        
+        return candidates
+    
+    async def _parse_pexels_response(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Parse Pexels API response"""
-        try:
-            if not data.get('photos'):
-                return None
-            
-            photo = data['photos'][0]
-            return {
-                'url': photo['src']['large'],
-                'source': 'pexels',
-                'width': photo['width'],
-                'height': photo['height'],
-                'description': photo.get('alt'),
-                'photographer': photo['photographer'],
-                'photographer_url': photo['photographer_url'],
-                'download_url': photo['src']['original']
-            }
-        except Exception as e:
-            logger.error(f"Error parsing Pexels response: {e}")
-            return None
+        candidates = []
+        
+        for photo in data.get('photos') or []:
+            try:
+                size = self._negotiate_size(photo['width'], photo['height'])
+                if not size:
+                    continue
+                
+                # Pexels resizes and compresses the original through its src query parameters
+                url = self._with_params(
+                    photo['src']['original'],
+                    auto='compress', cs='tinysrgb', w=size[0]
+                )
+                
+                candidates.append({
+                    'photo_id': str(photo['id']),
+                    'url': url,
+                    'source': 'pexels',
+                    'width': size[0],
+                    'height': size[1],
+                    'description': photo.get('alt'),
+                    'photographer': photo['photographer'],
+                    'photographer_url': photo['photographer_url'],
+                    'download_url': photo['src']['original']
+                })
+            except Exception as e:
+                logger.error(f"Error parsing Pexels response: {e}")
+        
+        return candidates
     
-    async def _parse_pixabay_response(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def _parse_pixabay_response(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Parse Pixabay API response"""
-        try:
-            if not data.get('hits'):
-                return None
-            
-            photo = data['hits'][0]
-            return {
-                'url': photo['webformatURL'],
-                'source': 'pixabay',
-                'width': photo['imageWidth'],
-                'height': photo['imageHeight'],
-                'description': photo.get('tags'),
-                'photographer': photo.get('user', 'Pixabay User'),
-                'photographer_url': f"https://pixabay.com/users/{photo.get('user_id', '')}",
-                'download_url': photo['largeImageURL']
-            }
-        except Exception as e:
-            logger.error(f"Error parsing Pixabay response: {e}")
+        candidates = []
+        
+        for photo in data.get('hits') or []:
+            try:
+                selected = self._select_pixabay_url(photo)
+                if not selected:
+                    continue
+                
+                url, width, height = selected
+                candidates.append({
+                    'photo_id': str(photo['id']),
+                    'url': url,
+                    'source': 'pixabay',
+                    'width': width,
+                    'height': height,
+                    'description': photo.get('tags'),
+                    'photographer': photo.get('user', 'Pixabay User'),
+                    'photographer_url': f"https://pixabay.com/users/{photo.get('user_id', '')}",
+                    'download_url': photo['largeImageURL']
+                })
+            except Exception as e:
+                logger.error(f"Error parsing Pixabay response: {e}")
+        
+        return candidates
+    
+    def _negotiate_size(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """Get the smallest proportional size covering the target box, or None if the original is too small"""
+        if width <= 0 or height <= 0:
+            return None
+        
+        target_width = max(self.target_width, math.ceil(self.target_height * width / height))
+        if target_width > width:
             return None
+        
+        return target_width, math.floor(height * target_width / width)
     
-    async def download_image(self, url: str) -> Optional[bytes]:
-        """Download image from URL"""
-        try:
-            if self.session:
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        return await response.read()
+    def _select_pixabay_url(self, photo: Dict[str, Any]) -> Optional[Tuple[str, int, int]]:
+        """Pick the smallest Pixabay rendition that still covers the target box"""
+        width, height = photo['imageWidth'], photo['imageHeight']
+        if not self._negotiate_size(width, height):
+            return None
+        
+        # fullHDURL is scaled to 1920px on the long side and only returned with full API access
+        if photo.get('fullHDURL'):
+            scale = min(1.0, 1920 / max(width, height))
+            hd_width, hd_height = math.floor(width * scale), math.floor(height * scale)
+            if hd_width >= self.target_width and hd_height >= self.target_height:
+                return photo['fullHDURL'], hd_width, hd_height
+        
+        if photo.get('imageURL'):
+            return photo['imageURL'], width, height
+        
+        # webformatURL and largeImageURL top out at 1280px and would always fail validation,
+        # so with a standard key (no full API access) no Pixabay result is usable
+        return None
+    
+    @staticmethod
+    def _with_params(url: str, **params) -> str:
+        """Merge query parameters into a URL, replacing existing values"""
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        query.update({key: str(value) for key, value in params.items()})
+        return urlunsplit(parts._replace(query=urlencode(query)))
+    
+    async def download_image(
+        self,
+        url: str,
+        source: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        header_check: Optional[Callable[[bytes], Optional[bool]]] = None
+    ) -> Optional[bytes]:
+        """Download image from URL, reporting the outcome to the source provider's circuit"""
+        # Hot wallpapers are served from disk instead of the network
+        if self.disk_cache and self.disk_cache.contains(url):
+            image_data = await self.disk_cache.get(url)
+            if image_data:
+                return image_data
+        
+        # Concurrent downloads of the same URL share one transfer (and the first caller's header check)
+        max_bytes = max_bytes or self.max_download_bytes
+        return await self.download_flights.do(
+            f"{url}|{max_bytes}",
+            lambda: self._download(url, source, max_bytes, header_check)
+        )
+    
+    async def _download(
+        self,
+        url: str,
+        source: Optional[str],
+        max_bytes: int,
+        header_check: Optional[Callable[[bytes], Optional[bool]]] = None
+    ) -> Optional[bytes]:
+        """Download an image over the network with retries"""
+        if not self.session:
+            await self.initialize()
+        
+        # All attempts share one deadline so callers fall back to a placeholder in bounded time
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.DOWNLOAD_DEADLINE_SECONDS
+        
+        # Retry transient failures (timeouts, connection errors, 429/5xx) with backoff
+        for attempt in range(self.config.DOWNLOAD_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(self.config.DOWNLOAD_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"⚠️ Giving up on image download after {self.config.DOWNLOAD_DEADLINE_SECONDS:.0f}s: {url}")
+                return None
             
-            # Fallback to requests
-            response = requests.get(url)
-            if response.status_code == 200:
-                return response.content
+            try:
+                async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=remaining)) as response:
+                    if source:
+                        self._record_response(source, response.status)
+                    
+                    if response.status == 429 or response.status >= 500:
+                        logger.warning(f"⚠️ Image download returned {response.status} (attempt {attempt + 1})")
+                        continue
+                    
+                    if response.status != 200:
+                        return None
+                    
+                    image_data = await self._read_capped(url, response, max_bytes, header_check)
+                    if not image_data:
+                        return None
+                    if self.disk_cache:
+                        await self.disk_cache.put(url, image_data, {'source': source})
+                    return image_data
                 
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"⚠️ Error downloading image (attempt {attempt + 1}): {e}")
+                if source:
+                    self._record_outcome(source, False, str(e) or type(e).__name__)
+            except Exception as e:
+                logger.error(f"Error downloading image: {e}")
+                return None
+        
+        return None
+    
+    async def _read_capped(
+        self,
+        url: str,
+        response: aiohttp.ClientResponse,
+        max_bytes: int,
+        header_check: Optional[Callable[[bytes], Optional[bool]]] = None
+    ) -> Optional[bytes]:
+        """Stream a response body into a preallocated buffer, aborting on oversize or a rejected header"""
+        total = response.content_length
+        
+        # Reject oversized images before transferring the body
+        if total is not None and total > max_bytes:
+            logger.warning(f"⚠️ Skipping oversized image ({total / (1024 * 1024):.2f}MB): {url}")
+            self.download_stats['aborted_oversize'] += 1
             return None
+        
+        buffer = bytearray(total or 0)
+        received = 0
+        self.active_downloads[url] = {'received': 0, 'total': total}
+        
+        try:
+            async for chunk in response.content.iter_chunked(self.download_chunk_size):
+                end = received + len(chunk)
+                
+                if end > max_bytes:
+                    logger.warning(f"⚠️ Aborted image download past {max_bytes / (1024 * 1024):.0f}MB: {url}")
+                    self.download_stats['aborted_oversize'] += 1
+                    self.download_stats['bytes_transferred'] += received
+                    return None
+                
+                if end <= len(buffer):
+                    buffer[received:end] = chunk
+                else:
+                    # Server sent more than Content-Length promised (or none was given)
+                    del buffer[received:]
+                    buffer.extend(chunk)
+                
+                received = end
+                self.active_downloads[url]['received'] = received
+                
+                # Probe the header as soon as it arrives and drop invalid images before the body
+                if header_check:
+                    verdict = header_check(bytes(buffer[:received]))
+                    if verdict is False:
+                        logger.warning(f"⚠️ Aborted image download after header check: {url}")
+                        self.download_stats['rejected_header'] += 1
+                        self.download_stats['bytes_transferred'] += received
+                        return None
+                    if verdict:
+                        header_check = None
             
-        except Exception as e:
-            logger.error(f"Error downloading image: {e}")
-            return None
+            self.download_stats['downloads'] += 1
+            self.download_stats['bytes_transferred'] += received
+            
+            return bytes(memoryview(buffer)[:received])
+            
+        finally:
+            self.active_downloads.pop(url, None)
+    
+    def get_download_stats(self) -> Dict[str, Any]:
+        """Get download counters and progress of in-flight downloads"""
+        return {
+            **self.download_stats,
+            'in_progress': {url: dict(progress) for url, progress in self.active_downloads.items()}
+        }
+    
+    def get_coalescing_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get single-flight deduplication metrics for provider queries and downloads"""
+        return {
+            'provider_queries': self.query_flights.get_stats(),
+            'downloads': self.download_flights.get_stats()
+        }
     
     async def validate_image_url(self, url: str) -> bool:
         """Validate if image URL is accessible"""
         try:
-            if self.session:
-                async with self.session.get(url) as response:
-                    return response.status == 200
+            if not self.session:
+                await self.initialize()
             
-            # Fallback to requests
-            response = requests.head(url)
-            return response.status_code == 200
+            async with self.session.head(url, allow_redirects=True) as response:
+                return response.status == 200
             
         except Exception as e:
             logger.error(f"Error validating image URL: {e}")
@@ -0,0 +1,125 @@
+"""
+LastPerson07Bot File ID Cache Module
+Maps source images to Telegram file_ids so repeats are resent without re-uploading
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07FileIdCache:
+    """Two-tier file_id cache: in-process LRU backed by a MongoDB collection"""
+    
+    COLLECTION = 'file_ids'
+    
+    def __init__(self, db_client, max_entries: int = 5000):
+        """Initialize the file_id cache"""
+        self.db_client = db_client
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        
+        # Cache statistics
+        self.stats = {
+            'memory_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'stored': 0
+        }
+    
+    @staticmethod
+    def make_key(wallpaper_info: Dict[str, Any]) -> Optional[str]:
+        """Build a cache key from the provider photo ID, falling back to the image URL"""
+        source = wallpaper_info.get('source', 'unknown')
+        
+        # Demo URLs are randomized per request and never repeat
+        if source == 'demo':
+            return None
+        
+        if wallpaper_info.get('photo_id'):
+            return f"{source}:{wallpaper_info['photo_id']}"
+        
+        if wallpaper_info.get('url'):
+            return f"url:{wallpaper_info['url']}"
+        
+        return None
+    
+    async def get(self, key: Optional[str]) -> Optional[str]:
+        """Look up a file_id, checking memory first and then the database"""
+        if not key:
+            return None
+        
+        file_id = self._entries.get(key)
+        if file_id:
+            self._entries.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return file_id
+        
+        try:
+            document = await self._collection().find_one({'_id': key})
+        except Exception as e:
+            logger.error(f"❌ Error reading file_id cache: {e}")
+            document = None
+        
+        if not document:
+            self.stats['misses'] += 1
+            return None
+        
+        self.stats['db_hits'] += 1
+        self._remember(key, document['file_id'])
+        return document['file_id']
+    
+    async def set(self, key: Optional[str], file_id: str) -> None:
+        """Store a file_id in both tiers"""
+        if not key or not file_id:
+            return
+        
+        self._remember(key, file_id)
+        self.stats['stored'] += 1
+        
+        try:
+            await self._collection().update_one(
+                {'_id': key},
+                {'$set': {'file_id': file_id, 'updated_at': datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"❌ Error writing file_id cache: {e}")
+    
+    async def invalidate(self, key: Optional[str]) -> None:
+        """Drop a file_id that Telegram no longer accepts"""
+        if not key:
+            return
+        
+        self._entries.pop(key, None)
+        
+        try:
+            await self._collection().delete_one({'_id': key})
+        except Exception as e:
+            logger.error(f"❌ Error invalidating file_id cache: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit statistics"""
+        lookups = self.stats['memory_hits'] + self.stats['db_hits'] + self.stats['misses']
+        hits = self.stats['memory_hits'] + self.stats['db_hits']
+        
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            **self.stats
+        }
+    
+    def _remember(self, key: str, file_id: str) -> None:
+        """Insert into the LRU layer, evicting the least recently used entry"""
+        self._entries[key] = file_id
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _collection(self):
+        """Get the backing MongoDB collection"""
+        return self.db_client.database[self.COLLECTION]
@@ -0,0 +1,94 @@
+"""
+LastPerson07Bot HTTP Client Module
+Application-scoped aiohttp session with a tuned, long-lived connection pool
+"""
+
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config.config import LastPerson07Config
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07HttpClient:
+    """Shared HTTP session with keep-alive, DNS caching and per-host connection limits"""
+    
+    USER_AGENT = 'LastPerson07Bot/2.0.0'
+    
+    def __init__(self, config: LastPerson07Config):
+        """Initialize the HTTP client"""
+        self.config = config
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.connector: Optional[aiohttp.TCPConnector] = None
+    
+    async def start(self) -> aiohttp.ClientSession:
+        """Create the connection pool and session"""
+        if self.session and not self.session.closed:
+            return self.session
+        
+        self.connector = aiohttp.TCPConnector(
+            limit=self.config.HTTP_POOL_LIMIT,
+            limit_per_host=self.config.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=self.config.HTTP_DNS_CACHE_SECONDS,
+            keepalive_timeout=self.config.HTTP_KEEPALIVE_SECONDS,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=self.connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.HTTP_TIMEOUT_SECONDS),
+            headers={'User-Agent': self.USER_AGENT}
+        )
+        
+        logger.info(
+            f"✅ HTTP client started (limit {self.config.HTTP_POOL_LIMIT}, "
+            f"{self.config.HTTP_POOL_LIMIT_PER_HOST} per host)"
+        )
+        return self.session
+    
+    async def warm_up(self, urls: List[str], timeout: float = 5.0) -> int:
+        """Resolve DNS and open TLS connections to the given hosts ahead of the first request"""
+        if not self.session:
+            await self.start()
+        
+        origins = list(dict.fromkeys(
+            f"{parts.scheme}://{parts.netloc}/" for parts in map(urlsplit, urls) if parts.netloc
+        ))
+        
+        async def touch(origin: str) -> bool:
+            try:
+                async with self.session.head(origin, timeout=aiohttp.ClientTimeout(total=timeout)):
+                    return True
+            except Exception as e:
+                logger.debug(f"HTTP warm-up for {origin} failed: {e}")
+                return False
+        
+        results = await asyncio.gather(*(touch(origin) for origin in origins))
+        warmed = sum(results)
+        
+        logger.info(f"✅ HTTP client warmed up {warmed}/{len(origins)} hosts")
+        return warmed
+    
+    async def close(self) -> None:
+        """Close the session and every pooled connection"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+            logger.info("✅ HTTP client closed")
+        
+        self.session = None
+        self.connector = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool usage"""
+        if not self.connector or self.connector.closed:
+            return {'open': False}
+        
+        return {
+            'open': True,
+            'limit': self.connector.limit,
+            'limit_per_host': self.connector.limit_per_host,
+            'dns_cache_seconds': self.config.HTTP_DNS_CACHE_SECONDS
+        }
@@ -0,0 +1,188 @@
+"""
+LastPerson07Bot Image Worker Module
+Process pool for CPU-heavy image work, fed through shared memory with bounded backpressure
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import struct
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Optional, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Input segments start with the PID of the worker running the job, so a stuck job can be killed
+PID_HEADER = struct.Struct('<q')
+
+class LastPerson07ImageWorkerSaturated(Exception):
+    """Raised when the image worker pool has no room for another job"""
+
+def _run_job(job: str, input_name: str, input_size: int, output_name: str, kwargs: Dict[str, Any]) -> Tuple[str, Any]:
+    """Run an image job in a worker process, reading its input from shared memory"""
+    # Imported here so the parent process only pays for PIL/OpenCV when a worker starts
+    from utils.metadata import LastPerson07ImageProcessor
+    
+    shm = shared_memory.SharedMemory(name=input_name)
+    try:
+        PID_HEADER.pack_into(shm.buf, 0, os.getpid())
+        image_data = bytes(shm.buf[PID_HEADER.size:PID_HEADER.size + input_size])
+    finally:
+        shm.close()
+    
+    processor = LastPerson07ImageProcessor()
+    result = getattr(processor, f"{job}_sync")(image_data, **kwargs)
+    
+    # Large binary results travel back through a segment named by the parent, which always unlinks it
+    if isinstance(result, (bytes, bytearray)) and result:
+        output = shared_memory.SharedMemory(name=output_name, create=True, size=len(result))
+        output.buf[:len(result)] = result
+        output.close()
+        return 'shm', len(result)
+    
+    return 'value', result
+
+def _unlink_segment(name: str) -> None:
+    """Remove a shared memory segment if a worker created it"""
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+class LastPerson07ImageWorkerPool:
+    """Bounded process pool running LastPerson07ImageProcessor jobs off the event loop"""
+    
+    def __init__(self, max_workers: int = 1, max_pending: int = 8, job_timeout: float = 10.0):
+        """Initialize the image worker pool"""
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_timeout = job_timeout
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        
+        # Worker statistics
+        self.stats = {
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'rejected': 0,
+            'restarts': 0
+        }
+    
+    def start(self) -> None:
+        """Start the worker processes"""
+        # Spawned workers do not inherit the event loop, sockets or threads of the bot process
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        logger.info(f"✅ Image worker pool started with {self.max_workers} processes")
+    
+    async def stop(self) -> None:
+        """Stop the worker processes, cancelling queued jobs"""
+        if self.executor:
+            executor, self.executor = self.executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+            logger.info("✅ Image worker pool stopped")
+    
+    def is_saturated(self) -> bool:
+        """Check whether new jobs would be rejected"""
+        return self.pending >= self.max_pending
+    
+    async def run(self, job: str, image_data: bytes, **kwargs) -> Any:
+        """Run a job on image bytes in a worker process; None if it failed or timed out"""
+        if not self.executor:
+            raise RuntimeError("Image worker pool is not started")
+        
+        if self.is_saturated():
+            self.stats['rejected'] += 1
+            raise LastPerson07ImageWorkerSaturated(
+                f"Image workers are busy ({self.pending}/{self.max_pending} jobs pending)"
+            )
+        
+        self.pending += 1
+        executor = self.executor
+        output_name = f"lp07img_{uuid.uuid4().hex[:16]}"
+        finished = []
+        shm = shared_memory.SharedMemory(create=True, size=PID_HEADER.size + len(image_data))
+        
+        try:
+            PID_HEADER.pack_into(shm.buf, 0, 0)
+            shm.buf[PID_HEADER.size:PID_HEADER.size + len(image_data)] = image_data
+            
+            future = executor.submit(_run_job, job, shm.name, len(image_data), output_name, kwargs)
+            
+            # An abandoned job may still write its output after we stop waiting; remove it once it finishes
+            future.add_done_callback(lambda _: finished and _unlink_segment(output_name))
+            
+            kind, result = await asyncio.wait_for(asyncio.wrap_future(future), self.job_timeout)
+            
+            self.stats['completed'] += 1
+            return self._read_output(output_name, result) if kind == 'shm' else result
+        
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            logger.error(f"❌ Image job {job} timed out after {self.job_timeout}s, restarting workers")
+            await self._restart(executor, PID_HEADER.unpack_from(shm.buf, 0)[0])
+            return None
+        except BrokenProcessPool as e:
+            self.stats['failed'] += 1
+            logger.error(f"❌ Image worker pool broke during {job}: {e}")
+            await self._restart(executor)
+            return None
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"❌ Image job {job} failed: {e}")
+            return None
+        finally:
+            self.pending -= 1
+            shm.close()
+            shm.unlink()
+            finished.append(True)
+            _unlink_segment(output_name)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get pool size, queue depth and job statistics"""
+        return {
+            'running': self.executor is not None,
+            'workers': self.max_workers,
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'saturated': self.is_saturated(),
+            **self.stats
+        }
+    
+    @staticmethod
+    def _read_output(name: str, size: int) -> bytes:
+        """Copy a binary job result out of shared memory; the caller unlinks it"""
+        output = shared_memory.SharedMemory(name=name)
+        try:
+            return bytes(output.buf[:size])
+        finally:
+            output.close()
+    
+    async def _restart(self, executor: ProcessPoolExecutor, stuck_pid: int = 0) -> None:
+        """Replace the worker processes; a running job cannot be cancelled any other way"""
+        # Kill the worker stuck on the timed-out job so it stops burning CPU (0: it never started)
+        if stuck_pid:
+            try:
+                os.kill(stuck_pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        
+        # Another failed job may already have replaced this executor
+        if executor is not self.executor:
+            return
+        
+        self.stats['restarts'] += 1
+        self.start()
+        
+        # The old executor is broken once a worker is killed; shut it down and reap its processes
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
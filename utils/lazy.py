@@ -0,0 +1,36 @@
+"""
+LastPerson07Bot Lazy Import Module
+Defers heavy third-party imports until a module attribute is first used
+"""
+
+import importlib
+from types import ModuleType
+from typing import Any, Optional
+
+class LastPerson07LazyModule:
+    """Stand-in for a module that imports it on first attribute access"""
+    
+    def __init__(self, name: str):
+        """Initialize the lazy module"""
+        self._name = name
+        self._module: Optional[ModuleType] = None
+    
+    def __getattr__(self, attr: str) -> Any:
+        """Import the real module if needed and resolve the attribute on it"""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        
+        value = getattr(self._module, attr)
+        
+        # Cache on the instance so later lookups skip __getattr__ entirely
+        setattr(self, attr, value)
+        return value
+    
+    def __repr__(self) -> str:
+        """Show whether the module has been loaded yet"""
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy_import(name: str) -> Any:
+    """Get a module that is only imported when first used"""
+    return LastPerson07LazyModule(name)
@@ -3,14 +3,21 @@ LastPerson07Bot Metadata Module
 Image processing and validation utilities
 """
 
+import asyncio
+import hashlib
 import logging
 import io
+import struct
+from collections import OrderedDict
 from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 
-import cv2
-import numpy as np
-from PIL import Image, ImageStat
+from utils.lazy import lazy_import
+
+# PIL, NumPy and OpenCV load on first use; most of this work runs in the image workers anyway
+Image = lazy_import('PIL.Image')
+np = lazy_import('numpy')
+cv2 = lazy_import('cv2')
 
 logger = logging.getLogger(__name__)
 
@@ -26,22 +33,53 @@ class LastPerson07ImageProcessor:
         
         # Supported formats
         self.SUPPORTED_FORMATS = ['JPEG', 'PNG', 'WEBP', 'JPG']
+        
+        # Telegram photo limits and the transcoded output that fits them
+        self.TELEGRAM_MAX_PHOTO_BYTES = 10 * 1024 * 1024
+        self.TELEGRAM_MAX_DIMENSION_SUM = 10000
+        self.TELEGRAM_MAX_ASPECT_RATIO = 20
+        self.TRANSCODE_MAX_SIDE = 2560
+        self.TRANSCODE_QUALITIES = (85, 75, 65)
+        
+        # Transcoded images by source content hash
+        self.TRANSCODE_CACHE_SIZE = 32
+        self._transcode_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        
+        # Colour statistics are computed on a reduced decode no larger than this
+        self.STATS_MAX_SIDE = 512
+        
+        # Dominant palette: clusters, mini-batch k-means rounds and pixels sampled per round
+        self.PALETTE_SIZE = 5
+        self.PALETTE_ITERATIONS = 12
+        self.PALETTE_BATCH_SIZE = 1024
+        
+        # Quality scoring runs on a grayscale decode no larger than this; the references mark a middling image
+        self.QUALITY_MAX_SIDE = 1024
+        self.QUALITY_SHARPNESS_REF = 100.0
+        self.QUALITY_NOISE_REF = 8.0
+        
+        # Blur is only judged on textured images: share of edges steeper than EDGE_STEP grey levels per pixel
+        # of a TEXTURE_SIDE thumbnail, with TEXTURE_REF counting as fully textured
+        self.QUALITY_TEXTURE_SIDE = 64
+        self.QUALITY_EDGE_STEP = 16.0
+        self.QUALITY_TEXTURE_REF = 0.05
+        
+        # Process pool for CPU-heavy work (injected by the bot)
+        self.worker_pool = None
+        
+        # Give up probing a stream whose header has not been found within this many bytes
+        self.MAX_PROBE_BYTES = 512 * 1024
     
     async def validate_image(self, image_data: bytes) -> bool:
         """Validate image meets quality requirements"""
         try:
-            # Convert bytes to image
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Check format
-            if image.format not in self.SUPPORTED_FORMATS:
-                logger.warning(f"Unsupported image format: {image.format}")
+            # Format and dimensions come from the header alone, without decoding the image
+            header = self.probe_header(image_data)
+            if not header:
+                logger.warning("Image header is truncated")
                 return False
             
-            # Check dimensions
-            width, height = image.size
-            if width < self.MIN_WIDTH or height < self.MIN_HEIGHT:
-                logger.warning(f"Image too small: {width}x{height} < {self.MIN_WIDTH}x{self.MIN_HEIGHT}")
+            if not self._header_acceptable(header):
                 return False
             
             # Check file size
@@ -50,14 +88,240 @@ class LastPerson07ImageProcessor:
                 logger.warning(f"File too large: {file_size_mb:.2f}MB > {self.MAX_FILE_SIZE_MB}MB")
                 return False
             
-            logger.debug(f"✅ Image validation passed: {width}x{height}, {image.format}")
+            logger.debug(f"✅ Image validation passed: {header['width']}x{header['height']}, {header['format']}")
             return True
             
         except Exception as e:
             logger.error(f"❌ Error validating image: {e}")
             return False
     
+    def check_header(self, data: bytes) -> Optional[bool]:
+        """Check the start of a download: True to continue, False to abort, None if more bytes are needed"""
+        try:
+            header = self.probe_header(data)
+        except ValueError as e:
+            # Other formats PIL can read are transcoded once downloaded
+            size = self._identify_size(data)
+            if not size:
+                logger.warning(f"Rejecting image stream: {e}")
+                return False
+            return size[0] >= self.MIN_WIDTH and size[1] >= self.MIN_HEIGHT
+        
+        if header is None:
+            # Headers buried behind very large metadata blocks are left to full validation
+            return True if len(data) >= self.MAX_PROBE_BYTES else None
+        
+        return self._header_acceptable(header)
+    
+    async def prepare_for_telegram(self, image_data: bytes) -> Optional[bytes]:
+        """Get image bytes Telegram accepts as a photo, transcoding oversized or exotic images"""
+        try:
+            header = self.probe_header(image_data)
+        except ValueError:
+            header = None
+        
+        if header and self._fits_telegram(header, len(image_data)):
+            return image_data
+        
+        key = hashlib.sha256(image_data).hexdigest()
+        cached = self._transcode_cache.get(key)
+        if cached:
+            self._transcode_cache.move_to_end(key)
+            return cached
+        
+        if self.worker_pool:
+            transcoded = await self.worker_pool.run('transcode_for_telegram', image_data)
+        else:
+            transcoded = await asyncio.to_thread(self.transcode_for_telegram_sync, image_data)
+        
+        if transcoded:
+            self._transcode_cache[key] = transcoded
+            while len(self._transcode_cache) > self.TRANSCODE_CACHE_SIZE:
+                self._transcode_cache.popitem(last=False)
+        
+        return transcoded
+    
+    def transcode_for_telegram_sync(self, image_data: bytes) -> Optional[bytes]:
+        """Re-encode an image as a progressive JPEG within Telegram's photo limits"""
+        try:
+            image = Image.open(io.BytesIO(image_data))
+            width, height = image.size
+            
+            # Shrink to the display size Telegram uses, but never below the wallpaper minimum
+            scale = min(
+                1.0,
+                self.TRANSCODE_MAX_SIDE / max(width, height),
+                self.TELEGRAM_MAX_DIMENSION_SUM / (width + height)
+            )
+            scale = min(1.0, max(scale, self.MIN_WIDTH / width, self.MIN_HEIGHT / height))
+            target = (max(1, round(width * scale)), max(1, round(height * scale)))
+            
+            if max(target) / min(target) > self.TELEGRAM_MAX_ASPECT_RATIO:
+                logger.warning(f"Cannot transcode {width}x{height}: aspect ratio exceeds Telegram's limit")
+                return None
+            
+            # JPEG sources decode directly at 1/2, 1/4 or 1/8 scale when that still covers the target
+            if image.format == 'JPEG':
+                image.draft('RGB', target)
+            
+            image = self._flatten_to_rgb(image)
+            if image.size != target:
+                image = image.resize(target, Image.LANCZOS, reducing_gap=3.0)
+            
+            for quality in self.TRANSCODE_QUALITIES:
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+                if buffer.tell() <= self.TELEGRAM_MAX_PHOTO_BYTES:
+                    logger.debug(f"✅ Transcoded {width}x{height} to {target[0]}x{target[1]} JPEG q{quality}")
+                    return buffer.getvalue()
+            
+            logger.warning(f"Transcoded image still exceeds {self.TELEGRAM_MAX_PHOTO_BYTES} bytes")
+            return None
+            
+        except Exception as e:
+            logger.error(f"❌ Error transcoding image: {e}")
+            return None
+    
+    def probe_header(self, data: bytes) -> Optional[Dict[str, Any]]:
+        """Read format and dimensions from a JPEG/PNG/WebP header; None if the data is too short"""
+        if data[:3] == b'\xff\xd8\xff':
+            return self._probe_jpeg(data)
+        if data[:8] == b'\x89PNG\r\n\x1a\n':
+            return self._probe_png(data)
+        if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            return self._probe_webp(data)
+        
+        if len(data) < 12:
+            return None
+        raise ValueError("unrecognized image signature")
+    
+    def _fits_telegram(self, header: Dict[str, Any], size: int) -> bool:
+        """Check whether an image can be sent as a Telegram photo as-is"""
+        width, height = header['width'], header['height']
+        return (
+            header['format'] in self.SUPPORTED_FORMATS
+            and size <= self.TELEGRAM_MAX_PHOTO_BYTES
+            and width + height <= self.TELEGRAM_MAX_DIMENSION_SUM
+            and max(width, height) <= self.TELEGRAM_MAX_ASPECT_RATIO * min(width, height)
+        )
+    
+    @staticmethod
+    def _identify_size(data: bytes) -> Optional[Tuple[int, int]]:
+        """Get image dimensions from any header PIL recognizes"""
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                return image.size
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _flatten_to_rgb(image: "Image.Image") -> "Image.Image":
+        """Convert to RGB, compositing any transparency onto white"""
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            rgba = image.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            return background
+        
+        return image.convert('RGB')
+    
+    def _header_acceptable(self, header: Dict[str, Any]) -> bool:
+        """Check a probed header against the format and dimension requirements"""
+        if header['format'] not in self.SUPPORTED_FORMATS:
+            logger.warning(f"Unsupported image format: {header['format']}")
+            return False
+        
+        width, height = header['width'], header['height']
+        if width < self.MIN_WIDTH or height < self.MIN_HEIGHT:
+            logger.warning(f"Image too small: {width}x{height} < {self.MIN_WIDTH}x{self.MIN_HEIGHT}")
+            return False
+        
+        return True
+    
+    @staticmethod
+    def _probe_jpeg(data: bytes) -> Optional[Dict[str, Any]]:
+        """Walk JPEG markers up to the first start-of-frame segment"""
+        # SOF markers carrying frame dimensions (excludes DHT, JPG and DAC)
+        sof_markers = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+        offset = 2
+        
+        while True:
+            # Skip fill bytes before the marker code
+            while offset < len(data) and data[offset] == 0xFF:
+                offset += 1
+            if offset >= len(data):
+                return None
+            
+            marker = data[offset]
+            offset += 1
+            
+            if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+                continue
+            if marker in (0xD9, 0xDA):
+                raise ValueError("JPEG has no frame header before image data")
+            
+            if offset + 2 > len(data):
+                return None
+            (length,) = struct.unpack_from('>H', data, offset)
+            if length < 2:
+                raise ValueError("corrupt JPEG segment length")
+            
+            if marker in sof_markers:
+                if offset + 7 > len(data):
+                    return None
+                height, width = struct.unpack_from('>HH', data, offset + 3)
+                return {'format': 'JPEG', 'width': width, 'height': height}
+            
+            offset += length
+            if offset < len(data) and data[offset] != 0xFF:
+                raise ValueError("corrupt JPEG marker")
+    
+    @staticmethod
+    def _probe_png(data: bytes) -> Optional[Dict[str, Any]]:
+        """Read dimensions from the PNG IHDR chunk"""
+        if len(data) < 24:
+            return None
+        if data[12:16] != b'IHDR':
+            raise ValueError("PNG does not start with IHDR")
+        
+        width, height = struct.unpack_from('>II', data, 16)
+        return {'format': 'PNG', 'width': width, 'height': height}
+    
+    @staticmethod
+    def _probe_webp(data: bytes) -> Optional[Dict[str, Any]]:
+        """Read dimensions from the first WebP chunk (VP8, VP8L or VP8X)"""
+        if len(data) < 30:
+            return None
+        
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            if data[23:26] != b'\x9d\x01\x2a':
+                raise ValueError("corrupt WebP VP8 frame")
+            width, height = struct.unpack_from('<HH', data, 26)
+            return {'format': 'WEBP', 'width': width & 0x3FFF, 'height': height & 0x3FFF}
+        
+        if chunk == b'VP8L':
+            if data[20] != 0x2F:
+                raise ValueError("corrupt WebP VP8L header")
+            (bits,) = struct.unpack_from('<I', data, 21)
+            return {'format': 'WEBP', 'width': (bits & 0x3FFF) + 1, 'height': ((bits >> 14) & 0x3FFF) + 1}
+        
+        if chunk == b'VP8X':
+            width = int.from_bytes(data[24:27], 'little') + 1
+            height = int.from_bytes(data[27:30], 'little') + 1
+            return {'format': 'WEBP', 'width': width, 'height': height}
+        
+        raise ValueError(f"unsupported WebP chunk {chunk!r}")
+    
     async def extract_metadata(self, image_data: bytes) -> Dict[str, Any]:
+        """Extract metadata from image in a worker process, or a thread when no pool is attached"""
+        if self.worker_pool:
+            metadata = await self.worker_pool.run('extract_metadata', image_data)
+            return metadata if metadata is not None else {'error': 'image worker failed'}
+        
+        return await asyncio.to_thread(self.extract_metadata_sync, image_data)
+    
+    def extract_metadata_sync(self, image_data: bytes) -> Dict[str, Any]:
         """Extract metadata from image"""
         try:
             # Open image with PIL
@@ -74,23 +338,141 @@ class LastPerson07ImageProcessor:
                 'file_size_mb': len(image_data) / (1024 * 1024)
             }
             
-            # Color analysis
-            stat = ImageStat.Stat(image)
-            metadata['color_stats'] = {
-                'mean_red': stat.mean[0],
-                'mean_green': stat.mean[1],
-                'mean_blue': stat.mean[2],
-                'std_red': stat.stddev[0],
-                'std_green': stat.stddev[1],
-                'std_blue': stat.stddev[2]
-            }
-            
-            # Aspect ratio
+            # Aspect ratio (taken before the reduced decode changes the size)
             width, height = image.size
             metadata['aspect_ratio'] = width / height
             
+            # Color analysis on a reduced decode
+            metadata['color_stats'] = self.compute_color_stats(image)
+            
+            # Perceptual hash for near-duplicate detection (reuses the reduced decode)
+            metadata['dhash'] = self.compute_dhash(image)
+            
+            # Dominant colours and brightness for colour-filtered /fetch
+            metadata.update(self.compute_palette(image))
+            
             return metadata
             
         except Exception as e:
             logger.error(f"❌ Error extracting metadata: {e}")
             return {'error': str(e)}
+    
+    async def score_quality(self, image_data: bytes) -> Optional[Dict[str, float]]:
+        """Score image quality in a worker process, or a thread when no pool is attached"""
+        if self.worker_pool:
+            return await self.worker_pool.run('score_quality', image_data)
+        
+        return await asyncio.to_thread(self.score_quality_sync, image_data)
+    
+    def score_quality_sync(self, image_data: bytes) -> Optional[Dict[str, float]]:
+        """Score sharpness (Laplacian variance, weighted by texture), exposure and noise into a 0-1 quality score"""
+        try:
+            # libjpeg/libwebp decode straight to half size in grayscale
+            gray = cv2.imdecode(np.frombuffer(image_data, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_2)
+            if gray is None:
+                return None
+            
+            scale = self.QUALITY_MAX_SIDE / max(gray.shape)
+            if scale < 1:
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            
+            sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+            
+            # Gradients and solid colours have no edges to be sharp or blurry; a blurry photo keeps its edges
+            # on a thumbnail, just without the fine detail the Laplacian measures
+            thumb_scale = self.QUALITY_TEXTURE_SIDE / max(gray.shape)
+            thumb = cv2.resize(gray, None, fx=thumb_scale, fy=thumb_scale, interpolation=cv2.INTER_AREA)
+            thumb = thumb.astype(np.float32)
+            # Sobel's 3x3 kernels weigh a one-pixel step by 8
+            steps = cv2.magnitude(cv2.Sobel(thumb, cv2.CV_32F, 1, 0), cv2.Sobel(thumb, cv2.CV_32F, 0, 1)) / 8
+            edge_density = float(np.count_nonzero(steps > self.QUALITY_EDGE_STEP)) / steps.size
+            texture = min(1.0, edge_density / self.QUALITY_TEXTURE_REF)
+            
+            # Share of clipped shadows/highlights and distance of the mean from mid-grey
+            clipped = float(np.count_nonzero((gray <= 5) | (gray >= 250))) / gray.size
+            mean = float(gray.mean()) / 255
+            
+            # Immerkaer's fast noise estimate: the kernel cancels image structure and keeps the noise
+            kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+            residual = cv2.filter2D(gray.astype(np.float32), -1, kernel)[1:-1, 1:-1]
+            noise = float(np.abs(residual).sum() * np.sqrt(np.pi / 2) / (6 * residual.size))
+            
+            sharpness_score = 1 - texture * self.QUALITY_SHARPNESS_REF / (sharpness + self.QUALITY_SHARPNESS_REF)
+            exposure_score = max(0.0, 1 - 2 * clipped) * (1 - abs(mean - 0.5))
+            noise_score = 1 / (1 + (noise / self.QUALITY_NOISE_REF) ** 2)
+            
+            return {
+                'score': round(0.6 * sharpness_score + 0.25 * exposure_score + 0.15 * noise_score, 3),
+                'sharpness': round(sharpness, 1),
+                'texture': round(texture, 3),
+                'exposure': round(exposure_score, 3),
+                'noise': round(noise, 2)
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Error scoring image quality: {e}")
+            return None
+    
+    def compute_dhash(self, image: "Image.Image") -> int:
+        """64-bit difference hash: whether each pixel of a 9x8 grayscale is brighter than its left neighbour"""
+        pixels = np.asarray(image.convert('L').resize((9, 8), Image.LANCZOS), dtype=np.int16)
+        bits = pixels[:, 1:] > pixels[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+    
+    def compute_palette(self, image: "Image.Image") -> Dict[str, Any]:
+        """Dominant colours by mini-batch k-means over the reduced decode, largest cluster first"""
+        # Only sampled pixels are converted to float, never the whole thumbnail
+        pixels = np.asarray(image.convert('RGB'), dtype=np.uint8).reshape(-1, 3)
+        rng = np.random.default_rng(0)
+        k = min(self.PALETTE_SIZE, len(pixels))
+        
+        centers = pixels[rng.choice(len(pixels), k, replace=False)].astype(np.float32)
+        counts = np.zeros(k, dtype=np.float32)
+        
+        for _ in range(self.PALETTE_ITERATIONS):
+            batch = pixels[rng.integers(0, len(pixels), self.PALETTE_BATCH_SIZE)].astype(np.float32)
+            labels = ((batch[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+            
+            # Move each centre towards its batch mean with a per-centre learning rate of 1/count
+            batch_counts = np.bincount(labels, minlength=k).astype(np.float32)
+            sums = np.zeros_like(centers)
+            np.add.at(sums, labels, batch)
+            counts += batch_counts
+            moved = batch_counts > 0
+            centers[moved] += (sums[moved] - batch_counts[moved, None] * centers[moved]) / counts[moved, None]
+        
+        sample = pixels[rng.integers(0, len(pixels), self.PALETTE_BATCH_SIZE * 4)].astype(np.float32)
+        labels = ((sample[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        weights = np.bincount(labels, minlength=k) / len(sample)
+        # Drop clusters no sampled pixel fell into (flat images need fewer than PALETTE_SIZE colours)
+        order = [index for index in np.argsort(weights)[::-1] if weights[index] > 0]
+        
+        # Rec. 601 luma of the sampled pixels, 0 (black) to 1 (white)
+        brightness = float((sample @ np.array([0.299, 0.587, 0.114], dtype=np.float32)).mean() / 255)
+        
+        return {
+            'palette': np.clip(np.rint(centers[order]), 0, 255).astype(int).tolist(),
+            'palette_weights': [round(float(weight), 3) for weight in weights[order]],
+            'brightness': round(brightness, 3)
+        }
+    
+    def compute_color_stats(self, image: "Image.Image") -> Dict[str, float]:
+        """Per-channel mean and standard deviation from a 1/8-scale draft or small thumbnail"""
+        if image.format == 'JPEG':
+            # libjpeg decodes straight to 1/8 scale, skipping most of the IDCT work
+            image.draft('RGB', (max(1, image.width // 8), max(1, image.height // 8)))
+        
+        image.thumbnail((self.STATS_MAX_SIDE, self.STATS_MAX_SIDE), reducing_gap=2.0)
+        
+        pixels = np.asarray(image.convert('RGB'), dtype=np.float64).reshape(-1, 3)
+        mean = pixels.mean(axis=0)
+        std = pixels.std(axis=0)
+        
+        return {
+            'mean_red': float(mean[0]),
+            'mean_green': float(mean[1]),
+            'mean_blue': float(mean[2]),
+            'std_red': float(std[0]),
+            'std_green': float(std[1]),
+            'std_blue': float(std[2])
+        }
@@ -0,0 +1,83 @@
+"""
+LastPerson07Bot Placeholders Module
+Local placeholder wallpapers used when every provider and download fails
+"""
+
+import asyncio
+import io
+import logging
+import random
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from utils.lazy import lazy_import
+
+# Only needed when a placeholder has to be rendered
+Image = lazy_import('PIL.Image')
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07PlaceholderPool:
+    """Pool of locally generated or bundled placeholder wallpapers"""
+    
+    # Gradient endpoints for generated placeholders
+    GRADIENTS = [
+        ((15, 32, 39), (44, 83, 100)),
+        ((35, 7, 77), (204, 83, 51)),
+        ((19, 78, 94), (113, 178, 128)),
+        ((15, 12, 41), (48, 43, 99)),
+        ((255, 126, 95), (254, 180, 123)),
+        ((67, 206, 162), (24, 90, 157))
+    ]
+    
+    def __init__(self, directory: str = 'data/placeholders', size: Tuple[int, int] = (1920, 1080)):
+        """Initialize the placeholder pool"""
+        self.directory = Path(directory)
+        self.size = size
+        self.images: List[bytes] = []
+        self._lock = asyncio.Lock()
+    
+    async def get_image(self) -> Optional[bytes]:
+        """Get a random placeholder wallpaper, building the pool on first use"""
+        if not self.images:
+            async with self._lock:
+                if not self.images:
+                    self.images = await asyncio.to_thread(self._build_pool)
+        
+        return random.choice(self.images) if self.images else None
+    
+    def get_wallpaper_info(self, category: str) -> Dict[str, Any]:
+        """Describe a placeholder wallpaper for captions"""
+        return {
+            'url': '',
+            'source': 'demo',
+            'width': self.size[0],
+            'height': self.size[1],
+            'description': f'Beautiful {category} wallpaper',
+            'photographer': 'LastPerson07Bot',
+            'download_url': '#'
+        }
+    
+    def _build_pool(self) -> List[bytes]:
+        """Load bundled placeholders from disk, generating gradients if there are none"""
+        images = []
+        
+        if self.directory.is_dir():
+            for path in sorted(self.directory.iterdir()):
+                if path.suffix.lower() in ('.jpg', '.jpeg', '.png', '.webp'):
+                    images.append(path.read_bytes())
+        
+        if not images:
+            images = [self._render_gradient(start, end) for start, end in self.GRADIENTS]
+        
+        logger.info(f"✅ Loaded {len(images)} placeholder wallpapers")
+        return images
+    
+    def _render_gradient(self, start: Tuple[int, int, int], end: Tuple[int, int, int]) -> bytes:
+        """Render a vertical two-colour gradient as a JPEG"""
+        mask = Image.linear_gradient('L').resize(self.size)
+        image = Image.composite(Image.new('RGB', self.size, end), Image.new('RGB', self.size, start), mask)
+        
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=85, optimize=True)
+        return buffer.getvalue()
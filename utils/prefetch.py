@@ -0,0 +1,253 @@
+"""
+LastPerson07Bot Prefetch Module
+Keeps ready-to-send wallpapers in memory for every category
+"""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any, Deque
+
+from config.config import LastPerson07Config
+from utils.image_worker import LastPerson07ImageWorkerSaturated
+from utils.file_id_cache import LastPerson07FileIdCache
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07PrefetchPool:
+    """Background pool of downloaded and validated wallpapers per category"""
+    
+    def __init__(
+        self,
+        fetcher,
+        image_processor,
+        config: LastPerson07Config,
+        duplicate_index=None,
+        color_index=None,
+        quality_scorer=None
+    ):
+        """Initialize the prefetch pool"""
+        self.fetcher = fetcher
+        self.image_processor = image_processor
+        self.config = config
+        self.duplicate_index = duplicate_index
+        self.color_index = color_index
+        self.quality_scorer = quality_scorer
+        
+        # Pool sizing
+        self.low_watermark = config.PREFETCH_LOW_WATERMARK
+        self.high_watermark = config.PREFETCH_HIGH_WATERMARK
+        self.memory_budget_bytes = config.PREFETCH_MEMORY_BUDGET_MB * 1024 * 1024
+        
+        # Ready wallpapers per category
+        self.pools: Dict[str, Deque[Dict[str, Any]]] = {
+            category: deque() for category in config.WALLPAPER_CATEGORIES
+        }
+        self.memory_used = 0
+        
+        # Background refill state
+        self._refill_tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(config.PREFETCH_CONCURRENCY)
+        self.running = False
+        
+        # Pool statistics
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'prefetched': 0,
+            'rejected': 0,
+            'budget_skips': 0,
+            'busy_skips': 0,
+            'duplicates': 0,
+            'low_quality': 0
+        }
+    
+    async def start(self) -> None:
+        """Start filling every category up to the high watermark"""
+        self.running = True
+        
+        for category in self.pools:
+            self._schedule_refill(category)
+        
+        logger.info(f"✅ Prefetch pool started for {len(self.pools)} categories")
+    
+    async def stop(self) -> None:
+        """Cancel refill tasks and release buffered images"""
+        self.running = False
+        
+        tasks = [task for task in self._refill_tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        self._refill_tasks.clear()
+        for pool in self.pools.values():
+            pool.clear()
+        self.memory_used = 0
+        
+        logger.info("✅ Prefetch pool stopped")
+    
+    def get(self, category: str) -> Optional[Dict[str, Any]]:
+        """Pop the best-scored ready wallpaper for a category and trigger a refill when low"""
+        pool = self.pools.get(category)
+        if pool is None:
+            return None
+        
+        item = pool.popleft() if pool else None
+        
+        if item:
+            self.memory_used -= len(item['image_data'])
+            self.stats['hits'] += 1
+        else:
+            self.stats['misses'] += 1
+        
+        if len(pool) <= self.low_watermark:
+            self._schedule_refill(category)
+        
+        return item
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get pool fill levels, memory usage and hit statistics"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        
+        return {
+            'running': self.running,
+            'sizes': {category: len(pool) for category, pool in self.pools.items()},
+            'memory_used_mb': self.memory_used / (1024 * 1024),
+            'memory_budget_mb': self.memory_budget_bytes / (1024 * 1024),
+            'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0,
+            **self.stats
+        }
+    
+    def _schedule_refill(self, category: str) -> None:
+        """Start a background refill for a category unless one is running"""
+        if not self.running:
+            return
+        
+        task = self._refill_tasks.get(category)
+        if task and not task.done():
+            return
+        
+        self._refill_tasks[category] = asyncio.create_task(self._refill(category))
+    
+    async def _refill(self, category: str) -> None:
+        """Fill a category pool up to the high watermark"""
+        pool = self.pools[category]
+        failures = 0
+        
+        try:
+            while self.running and len(pool) < self.high_watermark and failures < 3:
+                if self.memory_used >= self.memory_budget_bytes:
+                    self.stats['budget_skips'] += 1
+                    logger.debug(f"Prefetch memory budget reached, pausing refill for {category}")
+                    return
+                
+                async with self._semaphore:
+                    item = await self._prepare_wallpaper(category)
+                
+                if not item:
+                    failures += 1
+                    continue
+                
+                size = len(item['image_data'])
+                if self.memory_used + size > self.memory_budget_bytes:
+                    self.stats['budget_skips'] += 1
+                    return
+                
+                self._insert_ranked(pool, item)
+                self.memory_used += size
+                self.stats['prefetched'] += 1
+            
+            logger.debug(f"Prefetch pool for {category} holds {len(pool)} wallpapers")
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error refilling prefetch pool for {category}: {e}")
+    
+    @staticmethod
+    def _insert_ranked(pool: Deque[Dict[str, Any]], item: Dict[str, Any]) -> None:
+        """Insert an item keeping the pool ordered by quality score, best first"""
+        score = item.get('quality')
+        if score is None:
+            pool.append(item)
+            return
+        
+        for index, queued in enumerate(pool):
+            if queued.get('quality') is None or queued['quality'] < score:
+                pool.insert(index, item)
+                return
+        pool.append(item)
+    
+    async def _score_quality(self, url: str, image_data: bytes) -> Optional[float]:
+        """Get the stored quality score of a download, scoring it now if it has none"""
+        if not self.quality_scorer:
+            return None
+        
+        score = self.quality_scorer.get_score(url)
+        if score is None:
+            score = await self.quality_scorer.score(url, image_data)
+        return score
+    
+    async def _prepare_wallpaper(self, category: str) -> Optional[Dict[str, Any]]:
+        """Fetch, download and validate a single wallpaper"""
+        wallpaper_info = await self.fetcher.fetch_wallpaper(category)
+        if not wallpaper_info:
+            return None
+        
+        image_data = await self.fetcher.download_image(
+            wallpaper_info['url'],
+            wallpaper_info['source'],
+            header_check=self.image_processor.check_header
+        )
+        if not image_data:
+            return None
+        
+        try:
+            # Blurry or badly exposed images are dropped before transcoding, analysis and upload
+            quality = await self._score_quality(wallpaper_info['url'], image_data)
+        except LastPerson07ImageWorkerSaturated:
+            self.stats['busy_skips'] += 1
+            return None
+        
+        if quality is not None and quality < self.quality_scorer.min_score:
+            self.stats['low_quality'] += 1
+            return None
+        
+        try:
+            # Re-encode oversized or exotic images instead of discarding them
+            image_data = await self.image_processor.prepare_for_telegram(image_data) or image_data
+        except LastPerson07ImageWorkerSaturated:
+            self.stats['busy_skips'] += 1
+            return None
+        
+        if not await self.image_processor.validate_image(image_data):
+            self.stats['rejected'] += 1
+            return None
+        
+        try:
+            metadata = await self.image_processor.extract_metadata(image_data)
+        except LastPerson07ImageWorkerSaturated:
+            # Leave the workers to interactive requests; this wallpaper can wait for the next refill
+            self.stats['busy_skips'] += 1
+            return None
+        
+        # Drop near-duplicates of wallpapers already seen under another URL before they are uploaded
+        key = LastPerson07FileIdCache.make_key(wallpaper_info)
+        if self.duplicate_index and key and 'dhash' in metadata:
+            if self.duplicate_index.check_and_add(metadata['dhash'], key):
+                self.stats['duplicates'] += 1
+                return None
+        
+        # Make the wallpaper findable by colour once it is cached
+        if self.color_index:
+            self.color_index.add(key, category, wallpaper_info, metadata)
+        
+        return {
+            'wallpaper_info': wallpaper_info,
+            'image_data': image_data,
+            'metadata': metadata,
+            'quality': quality,
+            'fetched_at': datetime.utcnow()
+        }
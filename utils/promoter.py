@@ -11,6 +11,7 @@ from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from config.config import LastPerson07Config
+from db.quota import LastPerson07QuotaEngine
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class LastPerson07Promoter:
         """Initialize the promoter"""
         self.db_client = db_client
         self.config = config
+        self.quota = LastPerson07QuotaEngine(db_client, config.FREE_FETCH_LIMIT)
         
         # Promotional messages
         self.promo_messages = [
@@ -53,11 +55,9 @@ class LastPerson07Promoter:
                 return  # No promo for premium users
             
             # Check if user has reached daily limit
-            fetch_count = user_data.get('fetch_count', 0)
-            last_fetch = user_data.get('last_fetch_date')
+            fetch_count = await self.quota.today_count(user_id)
             
-            today = datetime.utcnow().date()
-            if last_fetch and last_fetch.date() == today:
+            if fetch_count:
                 remaining = self.config.FREE_FETCH_LIMIT - fetch_count
                 
                 # Show promo at certain points
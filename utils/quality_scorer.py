@@ -0,0 +1,124 @@
+"""
+LastPerson07Bot Quality Scorer Module
+Background sharpness/exposure/noise scoring of cached wallpapers in the image workers
+"""
+
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+
+from config.config import LastPerson07Config
+from utils.disk_cache import LastPerson07DiskCache
+from utils.image_worker import LastPerson07ImageWorkerSaturated
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07QualityScorer:
+    """Scores cached images in batches and keeps the result in the disk cache metadata"""
+    
+    def __init__(self, disk_cache: LastPerson07DiskCache, image_processor, config: LastPerson07Config):
+        """Initialize the quality scorer"""
+        self.disk_cache = disk_cache
+        self.image_processor = image_processor
+        self.min_score = config.QUALITY_MIN_SCORE
+        self.interval = config.QUALITY_SCAN_INTERVAL_SECONDS
+        self.batch_size = config.QUALITY_SCAN_BATCH
+        
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        
+        # Scoring statistics
+        self.stats = {
+            'scans': 0,
+            'scored': 0,
+            'low_quality': 0,
+            'failed': 0,
+            'busy_skips': 0
+        }
+    
+    async def start(self) -> None:
+        """Start the background scan loop"""
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Quality scorer started (every {self.interval:.0f}s, {self.batch_size} images per scan)")
+    
+    async def stop(self) -> None:
+        """Stop the background scan loop"""
+        self.running = False
+        
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        
+        logger.info("✅ Quality scorer stopped")
+    
+    def get_score(self, key: str) -> Optional[float]:
+        """Get the stored quality score of a cached image, None if it has not been scored"""
+        quality = self.disk_cache.get_meta(key).get('quality')
+        return quality.get('score') if quality else None
+    
+    def is_low_quality(self, key: str) -> bool:
+        """Check whether a cached image scored below the minimum"""
+        score = self.get_score(key)
+        return score is not None and score < self.min_score
+    
+    async def score(self, key: str, image_data: bytes) -> Optional[float]:
+        """Score image bytes and store the result under their cache key; raises when the workers are saturated"""
+        quality = await self.image_processor.score_quality(image_data)
+        
+        if quality is None:
+            self.stats['failed'] += 1
+        else:
+            self.stats['scored'] += 1
+            if quality['score'] < self.min_score:
+                self.stats['low_quality'] += 1
+        
+        # Failures are recorded as an empty result so the scan does not retry them forever
+        self.disk_cache.update_meta(key, {'quality': quality or {}})
+        return quality['score'] if quality else None
+    
+    async def scan_once(self) -> int:
+        """Score one batch of unscored cached images; returns the number scored"""
+        self.stats['scans'] += 1
+        scored = 0
+        
+        for key in self.disk_cache.keys_missing_meta('quality', self.batch_size):
+            # The mapped file goes straight into the worker's shared memory without a bytes copy
+            image_data = self.disk_cache.read(key)
+            if image_data is None:
+                continue
+            
+            try:
+                await self.score(key, image_data)
+            except LastPerson07ImageWorkerSaturated:
+                # Interactive requests come first; the rest of the batch waits for the next scan
+                self.stats['busy_skips'] += 1
+                break
+            finally:
+                image_data.release()
+            
+            scored += 1
+        
+        if scored:
+            logger.debug(f"🔍 Scored {scored} cached wallpapers")
+        return scored
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get scan statistics"""
+        return {
+            'running': self.running,
+            'min_score': self.min_score,
+            **self.stats
+        }
+    
+    async def _run(self) -> None:
+        """Scan periodically until stopped"""
+        while self.running:
+            try:
+                await self.scan_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error scoring cached wallpapers: {e}")
+            
+            await asyncio.sleep(self.interval)
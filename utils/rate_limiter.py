@@ -0,0 +1,104 @@
+"""
+LastPerson07Bot Rate Limiter Module
+Per-provider token buckets that follow the quota reported in response headers
+"""
+
+import logging
+import time
+from typing import Optional, Dict, Any, Mapping
+
+from aiolimiter import AsyncLimiter
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07RateLimiter:
+    """Token bucket for one provider at its configured rate, paused from X-Ratelimit-* headers"""
+    
+    def __init__(self, name: str, max_rate: int, time_period: float, reserve: int = 2):
+        """Initialize the rate limiter"""
+        self.name = name
+        self.time_period = time_period
+        self.reserve = reserve
+        self.limiter = AsyncLimiter(max_rate, time_period)
+        
+        # Quota as last reported by the provider
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.throttled = 0
+    
+    def has_capacity(self) -> bool:
+        """Check whether a request can go out now without nearing the provider's quota"""
+        if self._quota_exhausted():
+            return False
+        return self.limiter.has_capacity()
+    
+    async def acquire(self) -> None:
+        """Take a token, waiting for the bucket to refill if needed"""
+        await self.limiter.acquire()
+        if self.remaining is not None:
+            self.remaining -= 1
+    
+    def update_from_headers(self, headers: Mapping[str, str], status: int = 200) -> None:
+        """Track the quota from X-Ratelimit-Limit/Remaining/Reset response headers"""
+        limit = self._header_int(headers, 'X-Ratelimit-Limit')
+        remaining = self._header_int(headers, 'X-Ratelimit-Remaining')
+        reset = self._header_int(headers, 'X-Ratelimit-Reset')
+        
+        # The header's window can differ from the bucket's (Pexels reports its monthly quota), so the
+        # configured rate stays and the reported quota only pauses requests until it resets
+        if limit is not None and limit > 0:
+            self.limit = limit
+        
+        if remaining is not None:
+            self.remaining = remaining
+        
+        if reset is not None:
+            # Providers send either an epoch timestamp or seconds until reset
+            self.reset_at = float(reset) if reset > 1_000_000_000 else time.time() + reset
+        elif remaining is not None and (self.reset_at is None or self.reset_at <= time.time()):
+            self.reset_at = time.time() + self.time_period
+        
+        if status == 429:
+            retry_after = self._header_int(headers, 'Retry-After')
+            self.remaining = 0
+            self.reset_at = time.time() + (retry_after if retry_after is not None else self.time_period)
+            self.throttled += 1
+            logger.warning(f"⏳ {self.name} rate limited, pausing until quota resets")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get the remaining quota and time until it resets"""
+        reset_in = max(0, int(self.reset_at - time.time())) if self.reset_at else None
+        
+        return {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset_in': reset_in,
+            'available': self.has_capacity(),
+            'throttled': self.throttled
+        }
+    
+    def _quota_exhausted(self) -> bool:
+        """Check whether the reported quota is down to the reserve until the next reset"""
+        if self.remaining is None or self.remaining > self.reserve:
+            return False
+        
+        if self.reset_at is not None and time.time() >= self.reset_at:
+            # Window rolled over; trust the quota again until the next response says otherwise
+            self.remaining = None
+            self.reset_at = None
+            return False
+        
+        return True
+    
+    @staticmethod
+    def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+        """Parse an integer header, ignoring missing or malformed values"""
+        value = headers.get(name)
+        if value is None:
+            return None
+        
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
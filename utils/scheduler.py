@@ -11,19 +11,31 @@ from datetime import datetime, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from telegram import Bot
+from telegram.error import BadRequest
 
 from config.config import LastPerson07Config
+from utils.file_id_cache import LastPerson07FileIdCache
 
 logger = logging.getLogger(__name__)
 
 class LastPerson07Scheduler:
     """Task scheduler for automatic wallpaper posting"""
     
-    def __init__(self, db_client, bot: Bot, config: LastPerson07Config):
+    def __init__(
+        self,
+        db_client,
+        bot: Bot,
+        config: LastPerson07Config,
+        file_id_cache: Optional[LastPerson07FileIdCache] = None
+    ):
         """Initialize the scheduler"""
         self.db_client = db_client
         self.bot = bot
         self.config = config
+        self.file_id_cache = file_id_cache or LastPerson07FileIdCache(db_client)
+        
+        # One long-lived wallpaper fetcher, created on the first post
+        self.fetcher = None
         self.scheduler = AsyncIOScheduler()
         
         # Schedule intervals in minutes
@@ -64,6 +76,10 @@ class LastPerson07Scheduler:
             # Stop scheduler
             self.scheduler.shutdown(wait=True)
             
+            # Close the fetcher and its HTTP session
+            if self.fetcher:
+                await self.fetcher.close()
+            
             logger.info("✅ Scheduler stopped successfully")
             
         except Exception as e:
@@ -145,10 +161,7 @@ class LastPerson07Scheduler:
                 logger.info(f"Skipping scheduled post due to maintenance mode")
                 return
             
-            # Import fetcher here to avoid circular imports
-            from utils.fetcher import LastPerson07WallpaperFetcher
-            fetcher = LastPerson07WallpaperFetcher(self.db_client, self.config)
-            await fetcher.initialize()
+            fetcher = await self._get_fetcher()
             
             # Fetch wallpaper
             wallpaper_info = await fetcher.fetch_wallpaper(category)
@@ -157,11 +170,16 @@ class LastPerson07Scheduler:
                 logger.error(f"Failed to fetch scheduled wallpaper for chat {chat_id}")
                 return
             
-            # Download image
-            image_data = await fetcher.download_image(wallpaper_info['url'])
-            if not image_data:
-                logger.error(f"Failed to download scheduled wallpaper for chat {chat_id}")
-                return
+            # Resend by file_id when this image was already uploaded, otherwise download it
+            cache_key = self.file_id_cache.make_key(wallpaper_info)
+            file_id = await self.file_id_cache.get(cache_key)
+            
+            image_data = None
+            if not file_id:
+                image_data = await fetcher.download_image(wallpaper_info['url'], wallpaper_info['source'])
+                if not image_data:
+                    logger.error(f"Failed to download scheduled wallpaper for chat {chat_id}")
+                    return
             
             # Create caption
             caption = f"""
@@ -176,12 +194,37 @@ class LastPerson07Scheduler:
 """
             
             # Send to chat
-            message = await self.bot.send_photo(
-                chat_id=chat_id,
-                photo=image_data,
-                caption=caption,
-                parse_mode='Markdown'
-            )
+            try:
+                message = await self.bot.send_photo(
+                    chat_id=chat_id,
+                    photo=file_id or image_data,
+                    caption=caption,
+                    parse_mode='Markdown'
+                )
+            except BadRequest as e:
+                if not file_id:
+                    raise
+                
+                # Telegram no longer accepts the cached file_id; forget it and upload the bytes instead
+                logger.warning(f"⚠️ Cached file_id rejected for chat {chat_id}, re-uploading: {e}")
+                await self.file_id_cache.invalidate(cache_key)
+                file_id = None
+                
+                image_data = await fetcher.download_image(wallpaper_info['url'], wallpaper_info['source'])
+                if not image_data:
+                    logger.error(f"Failed to download scheduled wallpaper for chat {chat_id}")
+                    return
+                
+                message = await self.bot.send_photo(
+                    chat_id=chat_id,
+                    photo=image_data,
+                    caption=caption,
+                    parse_mode='Markdown'
+                )
+            
+            # Remember the uploaded file_id for future posts
+            if not file_id and message.photo:
+                await self.file_id_cache.set(cache_key, message.photo[-1].file_id)
             
             # Set random reaction
             from utils.reactions import LastPerson07Reactions
@@ -202,6 +245,16 @@ class LastPerson07Scheduler:
         except Exception as e:
             logger.error(f"❌ Error posting scheduled wallpaper: {e}")
     
+    async def _get_fetcher(self):
+        """Get the scheduler's fetcher, creating it on first use"""
+        if not self.fetcher:
+            # Import fetcher here to avoid circular imports
+            from utils.fetcher import LastPerson07WallpaperFetcher
+            self.fetcher = LastPerson07WallpaperFetcher(self.db_client, self.config)
+            await self.fetcher.initialize()
+        
+        return self.fetcher
+    
     async def cleanup_expired_schedules(self) -> None:
         """Clean up expired schedules and perform maintenance"""
         try:
@@ -0,0 +1,70 @@
+"""
+LastPerson07Bot Single-Flight Module
+Coalesces concurrent identical operations into one shared in-flight call
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+class LastPerson07SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result"""
+    
+    def __init__(self, name: str):
+        """Initialize the single-flight group"""
+        self.name = name
+        self._flights: Dict[str, asyncio.Task] = {}
+        
+        # Coalescing statistics
+        self.stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0
+        }
+    
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func for key, or join the call already in flight for it"""
+        self.stats['calls'] += 1
+        
+        task = self._flights.get(key)
+        if task:
+            self.stats['coalesced'] += 1
+        else:
+            self.stats['executions'] += 1
+            task = asyncio.create_task(func())
+            self._flights[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        
+        # Shield the shared call so one cancelled waiter does not cancel it for the others
+        return await asyncio.shield(task)
+    
+    def in_flight(self) -> int:
+        """Get the number of calls currently running"""
+        return len(self._flights)
+    
+    async def cancel_all(self) -> None:
+        """Cancel every call still in flight"""
+        tasks = list(self._flights.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flights.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call counts and the share of calls that were deduplicated"""
+        return {
+            'in_flight': len(self._flights),
+            'dedup_ratio': self.stats['coalesced'] / self.stats['calls'] if self.stats['calls'] else 0.0,
+            **self.stats
+        }
+    
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished call so the next caller starts a fresh one"""
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        
+        # Retrieve the exception so an unawaited failure is not reported as never retrieved
+        if not task.cancelled():
+            task.exception()
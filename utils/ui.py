@@ -86,6 +86,7 @@ class LastPerson07UI:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 • /start - Welcome message and bot overview
 • /fetch <category> - Get beautiful wallpapers
+• /fetch <category> dark|light|<colour> - Filter by brightness or colour (e.g. /fetch blue)
 • /categories - Browse all available categories
 • /help - This comprehensive help guide
 